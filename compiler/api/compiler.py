@@ -19,6 +19,7 @@
 import os
 import re
 import shutil
+from struct import calcsize
 
 HOME = "compiler/api"
 DESTINATION = "pyrogram/api"
@@ -32,6 +33,9 @@ FLAGS_RE_2 = re.compile(r"flags\.(\d+)\?([\w<>.]+)")
 FLAGS_RE_3 = re.compile(r"flags:#")
 INT_RE = re.compile(r"int(\d+)")
 
+# Struct formats of the arguments which always take the same room: flags and Bool (constructor ids) are unsigned
+FIXED_SIZE_TYPES = {"#": "I", "int": "i", "long": "q", "double": "d", "Bool": "I"}
+
 core_types = ["int", "long", "int128", "int256", "double", "bytes", "string", "Bool"]
 types_to_constructors = {}
 types_to_functions = {}
@@ -166,6 +170,296 @@ def sort_args(args):
     return args + flags
 
 
+def get_layout(fmt: str, layouts: list) -> str:
+    """Get the name of the precompiled struct layout for *fmt*, adding it to the layouts used by the object."""
+    name = "_struct_{}".format(fmt)
+
+    if name not in layouts:
+        layouts.append(name)
+
+    return name
+
+
+def get_read_types(args: list, layouts: list) -> str:
+    """Generate the body of a read_from method, which decodes the arguments from the buffer *b* at offset *i*.
+
+    Runs of consecutive fixed-size arguments are decoded at once with a precompiled struct layout.
+    """
+    lines = []
+    run = []  # (name, type) of the fixed-size arguments not decoded yet
+    deferred = []  # Lines depending on the flags only, emitted after the flags have been decoded
+
+    def flush():
+        if run:
+            layout = "<" + "".join(FIXED_SIZE_TYPES[t] for _, t in run)
+            struct_name = get_layout(layout[1:], layouts)
+
+            if len(run) == 1:
+                lines.append("{} = {}.unpack_from(b, i)[0]".format(run[0][0], struct_name))
+            else:
+                lines.append("{} = {}.unpack_from(b, i)".format(", ".join(n for n, _ in run), struct_name))
+
+            lines.append("i += {}".format(calcsize(layout)))
+
+            for name, t in run:
+                if t == "Bool":
+                    lines.append("{0} = {0} == BoolTrue.ID".format(name))
+
+            run.clear()
+
+        lines.extend(deferred)
+        deferred.clear()
+
+    for arg_name, arg_type in args:
+        if arg_name == "flags" and arg_type == "#":
+            run.append(("flags", "#"))
+            continue
+
+        flag = FLAGS_RE_2.findall(arg_type)
+
+        if flag:
+            index, flag_type = flag[0]
+
+            if flag_type == "true":
+                deferred.append("{} = True if flags & (1 << {}) else False".format(arg_name, index))
+                continue
+
+            flush()
+
+            if flag_type in FIXED_SIZE_TYPES:
+                layout = "<" + FIXED_SIZE_TYPES[flag_type]
+                struct_name = get_layout(layout[1:], layouts)
+
+                lines.append("if flags & (1 << {}):".format(index))
+                lines.append("    {} = {}.unpack_from(b, i)[0]".format(arg_name, struct_name))
+                lines.append("    i += {}".format(calcsize(layout)))
+
+                if flag_type == "Bool":
+                    lines.append("    {0} = {0} == BoolTrue.ID".format(arg_name))
+
+                lines.append("else:")
+                lines.append("    {} = None".format(arg_name))
+
+                continue
+
+            if flag_type in core_types:
+                reader = "{}.read_from(b, i)".format(flag_type.title())
+                default = "None"
+            elif "vector" in flag_type.lower():
+                sub_type = arg_type.split("<")[1][:-1]
+                reader = "TLObject.read_from(b, i{})".format(
+                    ", {}".format(sub_type.title()) if sub_type in core_types else ""
+                )
+                default = "[]"
+            else:
+                reader = "TLObject.read_from(b, i)"
+                default = "None"
+
+            lines.append("if flags & (1 << {}):".format(index))
+            lines.append("    {}, i = {}".format(arg_name, reader))
+            lines.append("else:")
+            lines.append("    {} = {}".format(arg_name, default))
+        elif arg_type in FIXED_SIZE_TYPES:
+            run.append((arg_name, arg_type))
+        else:
+            flush()
+
+            if arg_type in core_types:
+                reader = "{}.read_from(b, i)".format(arg_type.title())
+            elif "vector" in arg_type.lower():
+                sub_type = arg_type.split("<")[1][:-1]
+                reader = "TLObject.read_from(b, i{})".format(
+                    ", {}".format(sub_type.title()) if sub_type in core_types else ""
+                )
+            else:
+                reader = "TLObject.read_from(b, i)"
+
+            lines.append("{}, i = {}".format(arg_name, reader))
+
+    flush()
+
+    return "\n        ".join(lines) + "\n        " if lines else ""
+
+
+def get_skip_types(args: list, layouts: list) -> str:
+    """Generate the body of a skip_from method, which finds where the arguments at offset *i* of the buffer *b* end.
+
+    Nothing is decoded except for the flags: fixed-size arguments are jumped over at once.
+    """
+    lines = []
+    size = 0  # Size of the fixed-size arguments not jumped over yet
+
+    def flush():
+        nonlocal size
+
+        if size:
+            lines.append("i += {}".format(size))
+            size = 0
+
+    for arg_name, arg_type in args:
+        if arg_name == "flags" and arg_type == "#":
+            flush()
+            lines.append("flags = {}.unpack_from(b, i)[0]".format(get_layout("I", layouts)))
+            size += 4
+            continue
+
+        flag = FLAGS_RE_2.findall(arg_type)
+
+        if flag:
+            index, flag_type = flag[0]
+
+            if flag_type == "true":
+                continue
+
+            flush()
+
+            lines.append("if flags & (1 << {}):".format(index))
+
+            if flag_type in FIXED_SIZE_TYPES:
+                lines.append("    i += {}".format(calcsize("<" + FIXED_SIZE_TYPES[flag_type])))
+            elif flag_type in core_types:
+                lines.append("    i = {}.skip_from(b, i)".format(flag_type.title()))
+            elif "vector" in flag_type.lower():
+                sub_type = arg_type.split("<")[1][:-1]
+                lines.append("    i = TLObject.skip_from(b, i{})".format(
+                    ", {}".format(sub_type.title()) if sub_type in core_types else ""
+                ))
+            else:
+                lines.append("    i = TLObject.skip_from(b, i)")
+        elif arg_type in FIXED_SIZE_TYPES:
+            size += calcsize("<" + FIXED_SIZE_TYPES[arg_type])
+        else:
+            flush()
+
+            if arg_type in core_types:
+                lines.append("i = {}.skip_from(b, i)".format(arg_type.title()))
+            elif "vector" in arg_type.lower():
+                sub_type = arg_type.split("<")[1][:-1]
+                lines.append("i = TLObject.skip_from(b, i{})".format(
+                    ", {}".format(sub_type.title()) if sub_type in core_types else ""
+                ))
+            else:
+                lines.append("i = TLObject.skip_from(b, i)")
+
+    if size:
+        lines.append("return i + {}".format(size))
+    else:
+        lines.append("return i")
+
+    return "\n        ".join(lines)
+
+
+def get_write_types(args: list, layouts: list) -> tuple:
+    """Generate the bodies of the write_to and serialized_size methods.
+
+    write_to appends the constructor id and the arguments to the bytearray *b*. Runs of consecutive fixed-size values
+    are packed at once with a precompiled struct layout. serialized_size adds the size of the variable-length arguments
+    to the size of the fixed-size ones, without serializing anything.
+    """
+    lines = []
+    size_lines = []
+    fixed_size = 0
+    run = [("self.ID", "#")]  # (expression, type) of the fixed-size values not written yet
+
+    flags = [
+        "flags |= (1 << {}) if self.{} is not None else 0".format(FLAGS_RE.match(t).group(1), name)
+        for name, t in args
+        if FLAGS_RE.match(t)
+    ]
+
+    if flags:
+        lines.append("flags = 0")
+        lines.extend(flags)
+
+    def flush():
+        if run:
+            layout = "".join(FIXED_SIZE_TYPES[t] for _, t in run)
+            lines.append("b += {}.pack({})".format(get_layout(layout, layouts), ", ".join(e for e, _ in run)))
+            run.clear()
+
+    def get_writer(arg_name: str, arg_type: str) -> tuple:
+        # Code appending a variable-length value and code computing its size
+        if arg_type in core_types:
+            return (
+                "{}.write_to(b, self.{})".format(arg_type.title(), arg_name),
+                "{}.serialized_size(self.{})".format(arg_type.title(), arg_name)
+            )
+
+        if "vector" in arg_type.lower():
+            sub_type = arg_type.split("<")[1][:-1]
+            t = ", {}".format(sub_type.title()) if sub_type in core_types else ""
+
+            return (
+                "Vector.write_to(b, self.{}{})".format(arg_name, t),
+                "Vector.serialized_size(self.{}{})".format(arg_name, t)
+            )
+
+        return "self.{}.write_to(b)".format(arg_name), "self.{}.serialized_size()".format(arg_name)
+
+    for arg_name, arg_type in args:
+        if arg_name == "flags" and arg_type == "#":
+            run.append(("flags", "#"))
+            fixed_size += 4
+            continue
+
+        flag = FLAGS_RE_2.findall(arg_type)
+
+        if flag:
+            flag_type = flag[0][1]
+
+            if flag_type == "true":
+                continue
+
+            flush()
+
+            lines.append("if self.{} is not None:".format(arg_name))
+            size_lines.append("if self.{} is not None:".format(arg_name))
+
+            if flag_type in FIXED_SIZE_TYPES:
+                value = "self.{}".format(arg_name)
+
+                if flag_type == "Bool":
+                    value = "BoolTrue.ID if {} else BoolFalse.ID".format(value)
+
+                fmt = FIXED_SIZE_TYPES[flag_type]
+                lines.append("    b += {}.pack({})".format(get_layout(fmt, layouts), value))
+                size_lines.append("    size += {}".format(calcsize("<" + fmt)))
+            else:
+                write, size = get_writer(arg_name, arg_type.split("?")[1])
+                lines.append("    " + write)
+                size_lines.append("    size += " + size)
+        elif arg_type in FIXED_SIZE_TYPES:
+            value = "self.{}".format(arg_name)
+
+            if arg_type == "Bool":
+                value = "BoolTrue.ID if {} else BoolFalse.ID".format(value)
+
+            run.append((value, arg_type))
+            fixed_size += calcsize("<" + FIXED_SIZE_TYPES[arg_type])
+        else:
+            flush()
+
+            write, size = get_writer(arg_name, arg_type)
+            lines.append(write)
+
+            if arg_type in ("int128", "int256"):
+                fixed_size += int(arg_type[3:]) // 8
+            else:
+                size_lines.append("size += " + size)
+
+    flush()
+
+    # The constructor id
+    fixed_size += 4
+
+    if size_lines:
+        size_types = "size = {}\n        {}\n        return size".format(fixed_size, "\n        ".join(size_lines))
+    else:
+        size_types = "return {}".format(fixed_size)
+
+    return "\n        ".join(lines), size_types
+
+
 def start():
     shutil.rmtree("{}/types".format(DESTINATION), ignore_errors=True)
     shutil.rmtree("{}/functions".format(DESTINATION), ignore_errors=True)
@@ -264,6 +558,9 @@ def start():
             except KeyError:
                 pass
 
+    # Package path -> (class name, module name) of the classes it contains
+    packages = {}
+
     total = len(combinators)
     current = 0
     for c in combinators:  # type: Combinator
@@ -276,14 +573,7 @@ def start():
         path = "{}/{}/{}".format(DESTINATION, c.section, c.namespace)
         os.makedirs(path, exist_ok=True)
 
-        init = "{}/__init__.py".format(path)
-
-        if not os.path.exists(init):
-            with open(init, "w", encoding="utf-8") as f:
-                f.write(notice + "\n\n")
-
-        with open(init, "a", encoding="utf-8") as f:
-            f.write("from .{} import {}\n".format(snek(c.name), capit(c.name)))
+        packages.setdefault(path, []).append((capit(c.name), snek(c.name)))
 
         sorted_args = sort_args(c.args)
 
@@ -344,93 +634,15 @@ def start():
             if references:
                 docstring_args += "\n\n    See Also:\n        This object can be returned by " + references + "."
 
-        write_types = read_types = "" if c.has_flags else "# No flags\n        "
-
-        for arg_name, arg_type in c.args:
-            flag = FLAGS_RE_2.findall(arg_type)
-
-            if arg_name == "flags" and arg_type == "#":
-                write_flags = []
-
-                for i in c.args:
-                    flag = FLAGS_RE.match(i[1])
-                    if flag:
-                        write_flags.append(
-                            "flags |= (1 << {}) if self.{} is not None else 0".format(flag.group(1), i[0]))
-
-                write_flags = "\n        ".join([
-                    "flags = 0",
-                    "\n        ".join(write_flags),
-                    "b.write(Int(flags))\n        "
-                ])
-
-                write_types += write_flags
-                read_types += "flags = Int.read(b)\n        "
-
-                continue
-
-            if flag:
-                index, flag_type = flag[0]
-
-                if flag_type == "true":
-                    read_types += "\n        "
-                    read_types += "{} = True if flags & (1 << {}) else False".format(arg_name, index)
-                elif flag_type in core_types:
-                    write_types += "\n        "
-                    write_types += "if self.{} is not None:\n            ".format(arg_name)
-                    write_types += "b.write({}(self.{}))\n        ".format(flag_type.title(), arg_name)
-
-                    read_types += "\n        "
-                    read_types += "{} = {}.read(b) if flags & (1 << {}) else None".format(
-                        arg_name, flag_type.title(), index
-                    )
-                elif "vector" in flag_type.lower():
-                    sub_type = arg_type.split("<")[1][:-1]
+        layouts = []
+        read_types = get_read_types(c.args, layouts)
+        skip_types = get_skip_types(c.args, layouts)
+        write_types, size_types = get_write_types(c.args, layouts)
 
-                    write_types += "\n        "
-                    write_types += "if self.{} is not None:\n            ".format(arg_name)
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
-                        arg_name, ", {}".format(sub_type.title()) if sub_type in core_types else ""
-                    )
-
-                    read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{}) if flags & (1 << {}) else []\n        ".format(
-                        arg_name, ", {}".format(sub_type.title()) if sub_type in core_types else "", index
-                    )
-                else:
-                    write_types += "\n        "
-                    write_types += "if self.{} is not None:\n            ".format(arg_name)
-                    write_types += "b.write(self.{}.write())\n        ".format(arg_name)
-
-                    read_types += "\n        "
-                    read_types += "{} = TLObject.read(b) if flags & (1 << {}) else None\n        ".format(
-                        arg_name, index
-                    )
-            else:
-                if arg_type in core_types:
-                    write_types += "\n        "
-                    write_types += "b.write({}(self.{}))\n        ".format(arg_type.title(), arg_name)
-
-                    read_types += "\n        "
-                    read_types += "{} = {}.read(b)\n        ".format(arg_name, arg_type.title())
-                elif "vector" in arg_type.lower():
-                    sub_type = arg_type.split("<")[1][:-1]
-
-                    write_types += "\n        "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
-                        arg_name, ", {}".format(sub_type.title()) if sub_type in core_types else ""
-                    )
-
-                    read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{})\n        ".format(
-                        arg_name, ", {}".format(sub_type.title()) if sub_type in core_types else ""
-                    )
-                else:
-                    write_types += "\n        "
-                    write_types += "b.write(self.{}.write())\n        ".format(arg_name)
-
-                    read_types += "\n        "
-                    read_types += "{} = TLObject.read(b)\n        ".format(arg_name)
+        structs = "".join(
+            "\n{} = Struct(\"<{}\")".format(name, name[len("_struct_"):])
+            for name in layouts
+        )
 
         if c.docs:
             description = c.docs.split("|")[0].split("§")[1]
@@ -458,7 +670,10 @@ def start():
                         arguments=arguments,
                         fields=fields,
                         read_types=read_types,
+                        skip_types=skip_types,
+                        structs=structs + "\n" if structs else "",
                         write_types=write_types,
+                        size_types=size_types,
                         return_arguments=", ".join(
                             ["{0}={0}".format(i[0]) for i in sorted_args if i != ("flags", "#")]
                         ),
@@ -487,9 +702,21 @@ def start():
 
         f.write("\n}\n")
 
+    # Packages are lazy: each class is only imported the first time it's accessed
+    for path, classes in packages.items():
+        with open("{}/__init__.py".format(path), "w", encoding="utf-8") as f:
+            f.write(notice + "\n\n")
+            f.write("from pyrogram.api.core.lazy import LazyModule\n\n")
+            f.write("LazyModule.install(__name__, {")
+
+            for class_name, module_name in classes:
+                f.write("\n    \"{}\": \"{}\",".format(class_name, module_name))
+
+            f.write("\n})\n")
+
     for k, v in namespaces.items():
         with open("{}/{}/__init__.py".format(DESTINATION, k), "a", encoding="utf-8") as f:
-            f.write("from . import {}\n".format(", ".join([i for i in v])) if v else "")
+            f.write("\nfrom . import {}\n".format(", ".join([i for i in v])) if v else "")
 
 
 if "__main__" == __name__:
@@ -135,6 +135,10 @@ def pyrogram_api():
             add_handler
             remove_handler
             stop_transmission
+            start_media_server
+            stop_media_server
+            set_bandwidth_limit
+            get_transfer_stats
             export_session_string
             set_parse_mode
         """,
@@ -175,6 +179,9 @@ def pyrogram_api():
             stop_poll
             retract_vote
             download_media
+            stream_media
+            download_many
+            upload_many
         """,
         chats="""
         Chats
@@ -271,6 +278,7 @@ def pyrogram_api():
         advanced="""
         Advanced
             send
+            send_async
             resolve_peer
             save_file
         """
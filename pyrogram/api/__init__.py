@@ -16,10 +16,13 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from importlib import import_module
+from .core.tl_object import objects
 
-from .all import objects
 
-for k, v in objects.items():
-    path, name = v.rsplit(".", 1)
-    objects[k] = getattr(import_module(path), name)
+def preload():
+    """Import every generated class right away.
+
+    Classes are otherwise imported the first time they are needed, which keeps the start-up time low. Preloading
+    moves that cost upfront, e.g.: in a long-running process that doesn't want the first requests to be slower.
+    """
+    objects.preload()
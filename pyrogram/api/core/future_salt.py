@@ -16,8 +16,6 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
-
 from .primitives import Int, Long
 from .tl_object import TLObject
 
@@ -35,9 +33,9 @@ class FutureSalt(TLObject):
         self.salt = salt
 
     @staticmethod
-    def read(b: BytesIO, *args) -> "FutureSalt":
-        valid_since = Int.read(b)
-        valid_until = Int.read(b)
-        salt = Long.read(b)
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        valid_since, i = Int.read_from(b, i)
+        valid_until, i = Int.read_from(b, i)
+        salt, i = Long.read_from(b, i)
 
-        return FutureSalt(valid_since, valid_until, salt)
+        return FutureSalt(valid_since, valid_until, salt), i
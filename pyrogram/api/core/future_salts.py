@@ -16,8 +16,6 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
-
 from . import FutureSalt
 from .primitives import Int, Long
 from .tl_object import TLObject
@@ -36,11 +34,15 @@ class FutureSalts(TLObject):
         self.salts = salts
 
     @staticmethod
-    def read(b: BytesIO, *args) -> "FutureSalts":
-        req_msg_id = Long.read(b)
-        now = Int.read(b)
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        req_msg_id, i = Long.read_from(b, i)
+        now, i = Int.read_from(b, i)
+
+        count, i = Int.read_from(b, i)
+        salts = []
 
-        count = Int.read(b)
-        salts = [FutureSalt.read(b) for _ in range(count)]
+        for _ in range(count):
+            salt, i = FutureSalt.read_from(b, i)
+            salts.append(salt)
 
-        return FutureSalts(req_msg_id, now, salts)
+        return FutureSalts(req_msg_id, now, salts), i
@@ -17,7 +17,6 @@
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from gzip import compress, decompress
-from io import BytesIO
 
 from .primitives import Int, Bytes
 from .tl_object import TLObject
@@ -26,35 +25,37 @@ from .tl_object import TLObject
 class GzipPacked(TLObject):
     ID = 0x3072cfa1
 
-    __slots__ = ["packed_data"]
+    __slots__ = ["packed_data", "packed"]
 
     QUALNAME = "GzipPacked"
 
     def __init__(self, packed_data: TLObject):
         self.packed_data = packed_data
+        self.packed = None
 
     @staticmethod
-    def read(b: BytesIO, *args) -> "GzipPacked":
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        start, stop = Bytes.get_span(b, i)
+
         # Return the Object itself instead of a GzipPacked wrapping it
-        return TLObject.read(
-            BytesIO(
-                decompress(
-                    Bytes.read(b)
-                )
-            )
-        )
-
-    def write(self) -> bytes:
-        b = BytesIO()
-
-        b.write(Int(self.ID, False))
-
-        b.write(
-            Bytes(
-                compress(
-                    self.packed_data.write()
-                )
-            )
-        )
-
-        return b.getvalue()
+        obj, _ = TLObject.read_from(memoryview(decompress(b[start:stop])), 0)
+
+        return obj, stop + -stop % 4
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, *args) -> int:
+        return Bytes.skip_from(b, i)
+
+    def write_to(self, b: bytearray):
+        Int.write_to(b, self.ID, False)
+        Bytes.write_to(b, self.get_packed())
+
+    def serialized_size(self) -> int:
+        return 4 + Bytes.serialized_size(self.get_packed())
+
+    def get_packed(self) -> bytes:
+        # The size is only known once compressed: keep the compressed data around for the write that follows
+        if self.packed is None:
+            self.packed = compress(self.packed_data.write())
+
+        return self.packed
@@ -0,0 +1,71 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+
+class ObjectTable(dict):
+    """Constructor ids mapped to their classes, each one imported the first time its id is met.
+
+    *paths* maps the ids to the dotted paths of the classes. Unknown ids raise KeyError, like a plain dict would.
+    """
+
+    def __init__(self, paths: dict):
+        super().__init__()
+        self.paths = paths
+
+    def __missing__(self, key: int):
+        path, name = self.paths[key].rsplit(".", 1)
+        self[key] = getattr(import_module(path), name)
+
+        return self[key]
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.paths
+
+    def preload(self):
+        for key in self.paths:
+            self[key]
+
+
+class LazyModule(ModuleType):
+    """A package of generated classes, each one imported from its own module the first time it's accessed."""
+
+    @staticmethod
+    def install(name: str, classes: dict):
+        """Turn the package *name* into a lazy one. *classes* maps the names of its classes to their modules."""
+        module = sys.modules[name]
+        module.__class__ = LazyModule
+        module._classes = classes
+        module.__all__ = list(classes)
+
+    def __getattr__(self, name: str):
+        try:
+            module = self._classes[name]
+        except KeyError:
+            raise AttributeError("module '{}' has no attribute '{}'".format(self.__name__, name))
+
+        value = getattr(import_module("{}.{}".format(self.__name__, module)), name)
+        setattr(self, name, value)
+
+        return value
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._classes))
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections.abc import Sequence
+
 from .tl_object import TLObject
 
 
@@ -26,3 +28,41 @@ class List(list, TLObject):
         return "pyrogram.api.core.List([{}])".format(
             ",".join(TLObject.__repr__(i) for i in self)
         )
+
+
+class LazyList(Sequence):
+    """A Vector whose elements are only decoded once indexed or iterated over.
+
+    Only the offsets of the elements are found when the Vector is read, by jumping over them in the buffer. Decoded
+    elements are kept, so that each one is decoded once at most. Vectors nested in the elements are lazy as well.
+    """
+
+    __slots__ = ["data", "offsets", "read_from", "items"]
+
+    def __init__(self, data: memoryview, offsets: list, read_from: callable):
+        self.data = data
+        self.offsets = offsets
+        self.read_from = read_from
+        self.items = [None] * len(offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return List(self[i] for i in range(*index.indices(len(self.offsets))))
+
+        item = self.items[index]
+
+        if item is None:
+            item = self.items[index] = self.read_from(self.data, self.offsets[index])[0]
+
+        return item
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self):
+        return "pyrogram.api.core.LazyList([{}])".format(
+            ",".join(TLObject.__repr__(i) for i in self)
+        )
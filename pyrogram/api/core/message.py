@@ -16,11 +16,12 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
+from struct import Struct
 
-from .primitives import Int, Long
 from .tl_object import TLObject
 
+HEADER = Struct("<qii")
+
 
 class Message(TLObject):
     ID = 0x5bb8e511  # hex(crc32(b"message msg_id:long seqno:int bytes:int body:Object = Message"))
@@ -36,20 +37,18 @@ class Message(TLObject):
         self.body = body
 
     @staticmethod
-    def read(b: BytesIO, *args) -> "Message":
-        msg_id = Long.read(b)
-        seq_no = Int.read(b)
-        length = Int.read(b)
-        body = b.read(length)
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        msg_id, seq_no, length = HEADER.unpack_from(b, i)
+        i += HEADER.size
 
-        return Message(TLObject.read(BytesIO(body)), msg_id, seq_no, length)
+        # Move right after the body in case the object didn't consume exactly "length" bytes (e.g.: trailing padding)
+        body, _ = TLObject.read_from(b, i)
 
-    def write(self) -> bytes:
-        b = BytesIO()
+        return Message(body, msg_id, seq_no, length), i + length
 
-        b.write(Long(self.msg_id))
-        b.write(Int(self.seq_no))
-        b.write(Int(self.length))
-        b.write(self.body.write())
+    def write_to(self, b: bytearray):
+        b += HEADER.pack(self.msg_id, self.seq_no, self.length)
+        self.body.write_to(b)
 
-        return b.getvalue()
+    def serialized_size(self) -> int:
+        return HEADER.size + self.length
@@ -16,8 +16,6 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
-
 from .message import Message
 from .primitives import Int
 from .tl_object import TLObject
@@ -34,19 +32,22 @@ class MsgContainer(TLObject):
         self.messages = messages
 
     @staticmethod
-    def read(b: BytesIO, *args) -> "MsgContainer":
-        count = Int.read(b)
-        return MsgContainer([Message.read(b) for _ in range(count)])
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        count, i = Int.read_from(b, i)
+        messages = []
 
-    def write(self) -> bytes:
-        b = BytesIO()
+        for _ in range(count):
+            message, i = Message.read_from(b, i)
+            messages.append(message)
 
-        b.write(Int(self.ID, False))
+        return MsgContainer(messages), i
 
-        count = len(self.messages)
-        b.write(Int(count))
+    def write_to(self, b: bytearray):
+        Int.write_to(b, self.ID, False)
+        Int.write_to(b, len(self.messages))
 
         for message in self.messages:
-            b.write(message.write())
+            message.write_to(b)
 
-        return b.getvalue()
+    def serialized_size(self) -> int:
+        return 8 + sum(message.serialized_size() for message in self.messages)
@@ -29,6 +29,14 @@ class BoolFalse(TLObject):
     def read(cls, *args) -> bool:
         return cls.value
 
+    @classmethod
+    def read_from(cls, b: memoryview, i: int, *args) -> tuple:
+        return cls.value, i
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, *args) -> int:
+        return i
+
     def __new__(cls) -> bytes:
         return cls.ID.to_bytes(4, "little")
 
@@ -43,5 +51,21 @@ class Bool(TLObject):
     def read(cls, b: BytesIO) -> bool:
         return int.from_bytes(b.read(4), "little") == BoolTrue.ID
 
+    @classmethod
+    def read_from(cls, b: memoryview, i: int, *args) -> tuple:
+        return int.from_bytes(b[i:i + 4], "little") == BoolTrue.ID, i + 4
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, *args) -> int:
+        return i + 4
+
+    @staticmethod
+    def write_to(b: bytearray, value: bool):
+        b += (BoolTrue.ID if value else BoolFalse.ID).to_bytes(4, "little")
+
+    @staticmethod
+    def serialized_size(*args) -> int:
+        return 4
+
     def __new__(cls, value: bool) -> BoolTrue or BoolFalse:
         return BoolTrue() if value else BoolFalse()
@@ -36,6 +36,53 @@ class Bytes(TLObject):
 
         return x
 
+    @staticmethod
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        start, stop = Bytes.get_span(b, i)
+
+        return bytes(b[start:stop]), stop + -stop % 4
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, *args) -> int:
+        stop = Bytes.get_span(b, i)[1]
+
+        return stop + -stop % 4
+
+    @staticmethod
+    def get_span(b: memoryview, i: int) -> tuple:
+        # Bounds of the content, which is preceded by its length and followed by padding up to a multiple of 4 bytes
+        length = b[i]
+
+        if length <= 253:
+            return i + 1, i + 1 + length
+
+        length = int.from_bytes(b[i + 1:i + 4], "little")
+
+        return i + 4, i + 4 + length
+
+    @staticmethod
+    def write_to(b: bytearray, value: bytes):
+        length = len(value)
+
+        if length <= 253:
+            b.append(length)
+            b += value
+            b += bytes(-(length + 1) % 4)
+        else:
+            b.append(254)
+            b += length.to_bytes(3, "little")
+            b += value
+            b += bytes(-length % 4)
+
+    @staticmethod
+    def get_size(length: int) -> int:
+        # Length prefix, content and padding
+        return length + 1 + -(length + 1) % 4 if length <= 253 else length + 4 + -length % 4
+
+    @staticmethod
+    def serialized_size(value: bytes) -> int:
+        return Bytes.get_size(len(value))
+
     def __new__(cls, value: bytes) -> bytes:
         length = len(value)
 
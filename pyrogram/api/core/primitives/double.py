@@ -17,7 +17,7 @@
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from struct import unpack, pack
+from struct import unpack, pack, unpack_from
 
 from ..tl_object import TLObject
 
@@ -27,5 +27,21 @@ class Double(TLObject):
     def read(b: BytesIO, *args) -> float:
         return unpack("d", b.read(8))[0]
 
+    @staticmethod
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        return unpack_from("<d", b, i)[0], i + 8
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, *args) -> int:
+        return i + 8
+
+    @staticmethod
+    def write_to(b: bytearray, value: float):
+        b += pack("<d", value)
+
+    @staticmethod
+    def serialized_size(*args) -> int:
+        return 8
+
     def __new__(cls, value: float) -> bytes:
         return pack("d", value)
@@ -17,28 +17,55 @@
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
+from struct import Struct
 
 from ..tl_object import TLObject
 
 
 class Int(TLObject):
     SIZE = 4
+    LAYOUTS = (Struct("<I"), Struct("<i"))  # unsigned, signed
 
     @classmethod
     def read(cls, b: BytesIO, signed: bool = True) -> int:
         return int.from_bytes(b.read(cls.SIZE), "little", signed=signed)
 
+    @classmethod
+    def read_from(cls, b: memoryview, i: int, signed: bool = True) -> tuple:
+        return cls.LAYOUTS[signed].unpack_from(b, i)[0], i + cls.SIZE
+
+    @classmethod
+    def skip_from(cls, b: memoryview, i: int, *args) -> int:
+        return i + cls.SIZE
+
+    @classmethod
+    def write_to(cls, b: bytearray, value: int, signed: bool = True):
+        b += cls.LAYOUTS[signed].pack(value)
+
+    @classmethod
+    def serialized_size(cls, *args) -> int:
+        return cls.SIZE
+
     def __new__(cls, value: int, signed: bool = True) -> bytes:
         return value.to_bytes(cls.SIZE, "little", signed=signed)
 
 
 class Long(Int):
     SIZE = 8
+    LAYOUTS = (Struct("<Q"), Struct("<q"))
 
 
 class Int128(Int):
     SIZE = 16
 
+    @classmethod
+    def read_from(cls, b: memoryview, i: int, signed: bool = True) -> tuple:
+        return int.from_bytes(b[i:i + cls.SIZE], "little", signed=signed), i + cls.SIZE
+
+    @classmethod
+    def write_to(cls, b: bytearray, value: int, signed: bool = True):
+        b += value.to_bytes(cls.SIZE, "little", signed=signed)
+
 
-class Int256(Int):
+class Int256(Int128):
     SIZE = 32
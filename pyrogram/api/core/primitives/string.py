@@ -26,5 +26,20 @@ class String(Bytes):
     def read(b: BytesIO, *args) -> str:
         return super(String, String).read(b).decode(errors="replace")
 
+    @staticmethod
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        start, stop = Bytes.get_span(b, i)
+
+        # Decoded straight from the buffer, without an intermediate bytes object
+        return str(b[start:stop], "utf-8", "replace"), stop + -stop % 4
+
+    @staticmethod
+    def write_to(b: bytearray, value: str):
+        Bytes.write_to(b, value.encode())
+
+    @staticmethod
+    def serialized_size(value: str) -> int:
+        return Bytes.get_size(len(value.encode()))
+
     def __new__(cls, value: str) -> bytes:
         return super().__new__(cls, value.encode())
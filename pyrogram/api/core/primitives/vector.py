@@ -16,33 +16,114 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import BytesIO
+from struct import Struct, pack, unpack_from
 
-from . import Int
-from ..list import List
-from ..tl_object import TLObject
+from . import Int, Long, Double, Bool
+from ..list import List, LazyList
+from ..tl_object import TLObject, CONSTRUCTOR, objects
 
 
 class Vector(TLObject):
     ID = 0x1cb5c415
+    HEADER = Struct("<Ii")  # id, count
+
+    # Vectors of objects with at least this many elements are read as a LazyList; None to always decode them eagerly
+    LAZY_SIZE = None
+
+    # Struct formats of the element types decoded and encoded all at once
+    FORMATS = {Int: "i", Long: "q", Double: "d"}
 
     # Method added to handle the special case when a query returns a bare Vector (of Ints);
     # i.e., RpcResult body starts with 0x1cb5c415 (Vector Id) - e.g., messages.GetMessagesViews.
     @staticmethod
-    def _read(b: BytesIO) -> TLObject or int:
-        try:
-            return TLObject.read(b)
-        except KeyError:
-            b.seek(-4, 1)
-            return Int.read(b)
+    def _get_type(b: memoryview, i: int, count: int) -> TLObject:
+        # Ints aren't prefixed by a constructor id: tell them apart from objects by the first element
+        if count and CONSTRUCTOR.unpack_from(b, i)[0] not in objects:
+            return Int
+
+        return None
 
     @staticmethod
-    def read(b: BytesIO, t: TLObject = None) -> list:
-        return List(
-            t.read(b) if t
-            else Vector._read(b)
-            for _ in range(Int.read(b))
-        )
+    def read_from(b: memoryview, i: int, t: TLObject = None) -> tuple:
+        count, i = Int.read_from(b, i)
+
+        if t is None:
+            t = Vector._get_type(b, i, count)
+
+        if t in Vector.FORMATS:
+            return (
+                List(unpack_from("<{}{}".format(count, Vector.FORMATS[t]), b, i)),
+                i + count * t.serialized_size()
+            )
+
+        if t is None and Vector.LAZY_SIZE is not None and count >= Vector.LAZY_SIZE:
+            return Vector.read_lazy_from(b, i, count)
+
+        read_from = t.read_from if t else TLObject.read_from
+        items = List()
+
+        for _ in range(count):
+            item, i = read_from(b, i)
+            items.append(item)
+
+        return items, i
+
+    @staticmethod
+    def read_lazy_from(b: memoryview, i: int, count: int) -> tuple:
+        start = i
+        offsets = []
+
+        for _ in range(count):
+            offsets.append(i - start)
+            i = TLObject.skip_from(b, i)
+
+        data = b[start:i]
+
+        # The elements are decoded later on, from a buffer that can't be changed or released in the meantime
+        if not isinstance(data.obj, bytes):
+            data = memoryview(bytes(data))
+
+        return LazyList(data, offsets, TLObject.read_from), i
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, t: TLObject = None) -> int:
+        count, i = Int.read_from(b, i)
+
+        if t is None:
+            t = Vector._get_type(b, i, count)
+
+        if t in (Int, Long, Double, Bool):
+            return i + count * t.serialized_size()
+
+        skip_from = t.skip_from if t else TLObject.skip_from
+
+        for _ in range(count):
+            i = skip_from(b, i)
+
+        return i
+
+    @staticmethod
+    def write_to(b: bytearray, value: list, t: TLObject = None):
+        b += Vector.HEADER.pack(Vector.ID, len(value))
+
+        if t in Vector.FORMATS:
+            b += pack("<{}{}".format(len(value), Vector.FORMATS[t]), *value)
+        elif t:
+            for i in value:
+                t.write_to(b, i)
+        else:
+            for i in value:
+                i.write_to(b)
+
+    @staticmethod
+    def serialized_size(value: list, t: TLObject = None) -> int:
+        if t in (Int, Long, Double, Bool):
+            return 8 + len(value) * t.serialized_size()
+
+        if t:
+            return 8 + sum(t.serialized_size(i) for i in value)
+
+        return 8 + sum(i.serialized_size() for i in value)
 
     def __new__(cls, value: list, t: TLObject = None) -> bytes:
         return b"".join(
@@ -17,10 +17,18 @@
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from collections import OrderedDict
+from collections.abc import Sequence
 from io import BytesIO
 from json import dumps
+from struct import Struct
 
-from ..all import objects
+from .lazy import ObjectTable
+from ..all import objects as paths
+
+CONSTRUCTOR = Struct("<I")
+
+# Classes are only imported once needed: when their id is met while decoding, or when accessed by name
+objects = ObjectTable(paths)
 
 
 class TLObject:
@@ -28,11 +36,42 @@ class TLObject:
 
     QUALNAME = "Base"
 
+    @classmethod
+    def read(cls, b: BytesIO, *args):
+        # Objects are decoded straight from the stream's buffer, then the stream is moved past them
+        with b.getbuffer() as data:
+            obj, i = cls.read_from(data, b.tell(), *args)
+
+        b.seek(i)
+
+        return obj
+
     @staticmethod
-    def read(b: BytesIO, *args):  # TODO: Rename b -> data
-        return objects[int.from_bytes(b.read(4), "little")].read(b, *args)
+    def read_from(b: memoryview, i: int, *args) -> tuple:
+        """Decode the object starting at offset *i* of the buffer *b*.
+
+        Returns the object along with the offset right after it. On TLObject itself, the object is prefixed by its
+        constructor id; on subclasses, the id has already been consumed.
+        """
+        return objects[CONSTRUCTOR.unpack_from(b, i)[0]].read_from(b, i + 4, *args)
+
+    @staticmethod
+    def skip_from(b: memoryview, i: int, *args) -> int:
+        """Get the offset right after the object starting at offset *i* of the buffer *b*, without decoding it."""
+        return objects[CONSTRUCTOR.unpack_from(b, i)[0]].skip_from(b, i + 4, *args)
 
     def write(self, *args) -> bytes:
+        b = bytearray()
+        self.write_to(b)
+
+        return bytes(b)
+
+    def write_to(self, b: bytearray):
+        """Append the serialized object to *b*."""
+        pass
+
+    def serialized_size(self) -> int:
+        """Get the length of the serialized object, without serializing it."""
         pass
 
     @staticmethod
@@ -40,6 +79,10 @@ class TLObject:
         if isinstance(obj, bytes):
             return repr(obj)
 
+        # Lazily decoded Vectors
+        if isinstance(obj, Sequence):
+            return list(obj)
+
         return OrderedDict(
             [("_", obj.QUALNAME)]
             + [
@@ -73,7 +116,7 @@ class TLObject:
         return True
 
     def __len__(self) -> int:
-        return len(self.write())
+        return self.serialized_size()
 
     def __getitem__(self, item):
         return getattr(self, item)
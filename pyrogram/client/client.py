@@ -16,21 +16,26 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import itertools
+import json
 import logging
 import math
+import mmap
 import os
 import re
 import shutil
 import tempfile
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError, wait, FIRST_COMPLETED
 from configparser import ConfigParser
+from functools import partial
 from hashlib import sha256, md5
 from importlib import import_module, reload
 from pathlib import Path
 from signal import signal, SIGINT, SIGTERM, SIGABRT
 from threading import Thread
-from typing import Union, List
+from typing import Union, List, BinaryIO, Generator, Tuple, Iterable
 
 from pyrogram.api import functions, types
 from pyrogram.api.core import TLObject
@@ -41,9 +46,10 @@ from pyrogram.crypto import AES
 from pyrogram.errors import (
     PhoneMigrate, NetworkMigrate, SessionPasswordNeeded,
     FloodWait, PeerIdInvalid, VolumeLocNotFound, UserMigrate, ChannelPrivate, AuthBytesInvalid,
-    BadRequest)
-from pyrogram.session import Auth, Session
-from .ext import utils, Syncer, BaseClient, Dispatcher
+    BadRequest, AuthKeyUnregistered, FileReferenceExpired)
+from pyrogram.session import Auth, Session, SessionPool
+from .ext import utils, Syncer, BaseClient, Dispatcher, TokenBucket
+from .ext.media_server import MediaServer
 from .methods import Methods
 from .storage import Storage, FileStorage, MemoryStorage
 from .types import User, SentCode, TermsOfService
@@ -129,6 +135,12 @@ class Client(Methods, BaseClient):
             Thread pool size for handling incoming updates.
             Defaults to 4.
 
+        pool_size (``int``, *optional*):
+            Maximum number of extra connections to your home DC used to serve slow and bulk queries (e.g.: history,
+            dialogs and members fetching) in parallel, away from the main connection which receives updates.
+            Extra connections share the same authorization and are opened on demand.
+            Defaults to 0 (every query goes through the main connection).
+
         workdir (``str``, *optional*):
             Define a custom working directory. The working directory is the location in your filesystem where Pyrogram
             will store your session files.
@@ -154,6 +166,14 @@ class Client(Methods, BaseClient):
             download_media, ...) are less prone to throw FloodWait exceptions.
             Only available for users, bots will ignore this parameter.
             Defaults to False (normal session).
+
+        upload_cache (``bool``, *optional*):
+            Pass True to remember the files uploaded from local paths by their content, so that sending the same file
+            again (e.g.: to many chats) reuses the already uploaded media instead of uploading it once more. The cache is
+            kept in the session storage; entries whose media is no longer valid are dropped and the file is uploaded
+            again. Note that the cached media is sent as it was the first time: the thumbnail and attributes passed
+            to later calls are ignored.
+            Defaults to False (every file is uploaded on each call).
     """
 
     def __init__(
@@ -174,11 +194,13 @@ class Client(Methods, BaseClient):
         password: str = None,
         force_sms: bool = False,
         workers: int = BaseClient.WORKERS,
+        pool_size: int = BaseClient.POOL_SIZE,
         workdir: str = BaseClient.WORKDIR,
         config_file: str = BaseClient.CONFIG_FILE,
         plugins: dict = None,
         no_updates: bool = None,
-        takeout: bool = None
+        takeout: bool = None,
+        upload_cache: bool = None
     ):
         super().__init__()
 
@@ -199,11 +221,13 @@ class Client(Methods, BaseClient):
         self.password = password
         self.force_sms = force_sms
         self.workers = workers
+        self.pool_size = pool_size
         self.workdir = Path(workdir)
         self.config_file = Path(config_file)
         self.plugins = plugins
         self.no_updates = no_updates
         self.takeout = takeout
+        self.upload_cache = upload_cache
 
         if isinstance(session_name, str):
             if session_name == ":memory:" or len(session_name) >= MemoryStorage.SESSION_STRING_SIZE:
@@ -218,6 +242,13 @@ class Client(Methods, BaseClient):
 
         self.dispatcher = Dispatcher(self, workers)
 
+        # Warm media sessions to the home DC, shared by every upload
+        self.upload_sessions = SessionPool(
+            lambda: self.create_media_session(self.storage.dc_id()),
+            self.UPLOAD_SESSIONS,
+            self.MEDIA_SESSION_IDLE_TIMEOUT
+        )
+
     def __enter__(self):
         return self.start()
 
@@ -263,6 +294,7 @@ class Client(Methods, BaseClient):
         self.session = Session(self, self.storage.dc_id(), self.storage.auth_key())
         self.session.start()
 
+        self.peers_executor = ThreadPoolExecutor(1)
         self.is_connected = True
 
         return bool(self.storage.user_id())
@@ -280,7 +312,19 @@ class Client(Methods, BaseClient):
         if self.is_initialized:
             raise ConnectionError("Can't disconnect an initialized client")
 
+        with self.session_pool_lock:
+            for i in self.session_pool:
+                i.stop()
+
+            self.session_pool.clear()
+
+        self.upload_sessions.close()
+
         self.session.stop()
+
+        # Peers of the responses received so far are cached before the storage is closed
+        self.peers_executor.shutdown()
+
         self.storage.close()
         self.is_connected = False
 
@@ -312,6 +356,10 @@ class Client(Methods, BaseClient):
 
             self.updates_workers_list[-1].start()
 
+        self.download_scheduler.workers = self.DOWNLOAD_WORKERS
+        self.download_scheduler.max_per_dc = self.DOWNLOAD_PER_DC
+        self.download_scheduler.cache_time = self.DOWNLOAD_CACHE_TIME
+
         for i in range(self.DOWNLOAD_WORKERS):
             self.download_workers_list.append(
                 Thread(
@@ -347,8 +395,8 @@ class Client(Methods, BaseClient):
         Syncer.remove(self)
         self.dispatcher.stop()
 
-        for _ in range(self.DOWNLOAD_WORKERS):
-            self.download_queue.put(None)
+        self.stop_media_server()
+        self.download_scheduler.stop(self.DOWNLOAD_WORKERS)
 
         for i in self.download_workers_list:
             i.join()
@@ -368,6 +416,11 @@ class Client(Methods, BaseClient):
 
         self.media_sessions.clear()
 
+        for i in self.download_sessions.values():
+            i.close()
+
+        self.download_sessions.clear()
+
         self.is_initialized = False
 
     def send_code(self, phone_number: str) -> SentCode:
@@ -1110,6 +1163,114 @@ class Client(Methods, BaseClient):
         """
         raise Client.StopTransmission
 
+    def start_media_server(self, host: str = "127.0.0.1", port: int = 8080) -> MediaServer:
+        """Start an embedded HTTP server streaming media straight from Telegram.
+
+        Media are served at ``/file/<file_id>`` and support *Range* requests: only the chunks overlapping the
+        requested range are fetched, so that a web player can seek in a big video without the file being downloaded
+        first. Chunks are cached in memory and shared by every viewer. Use the *url_for* method of the returned
+        server to get the URL of a media: media registered this way are served with their size and mime type.
+
+        Parameters:
+            host (``str``, *optional*):
+                The address to listen on.
+                Defaults to "127.0.0.1" (local connections only).
+
+            port (``int``, *optional*):
+                The port to listen on. Pass 0 to pick a free port.
+                Defaults to 8080.
+
+        Returns:
+            ``MediaServer``: The running server.
+
+        Raises:
+            RuntimeError: In case the media server is already running.
+
+        Example:
+            .. code-block:: python
+
+                server = app.start_media_server()
+                message = app.get_messages("pyrogramchat", 123)
+
+                print(server.url_for(message))  # http://127.0.0.1:8080/file/BAADBAAD...
+        """
+        if self.media_server is not None:
+            raise RuntimeError("The media server is already running")
+
+        self.media_server = MediaServer(self, host, port, self.MEDIA_SERVER_CACHE_SIZE, self.MEDIA_SERVER_FILES)
+        self.media_server.start()
+
+        return self.media_server
+
+    def stop_media_server(self):
+        """Stop the media server started with :meth:`~Client.start_media_server`.
+
+        The media server is also stopped automatically when the client is stopped.
+        """
+        if self.media_server is not None:
+            self.media_server.stop()
+            self.media_server = None
+
+    def set_bandwidth_limit(self, upload: int = None, download: int = None, shared: bool = False):
+        """Limit the speed of file uploads and downloads.
+
+        Limits apply to the file chunks only: messages and updates keep flowing at full speed. A single transfer can be
+        limited on its own too, see :meth:`~Client.download_media` and :meth:`~Client.save_file`.
+
+        Parameters:
+            upload (``int``, *optional*):
+                Maximum upload speed, in bytes per second. Pass 0 to remove the limit.
+                By default, the current upload limit is kept.
+
+            download (``int``, *optional*):
+                Maximum download speed, in bytes per second. Pass 0 to remove the limit.
+                By default, the current download limit is kept.
+
+            shared (``bool``, *optional*):
+                Pass True to set the limits shared by every client running in this process instead of the limits of
+                this client alone.
+
+        Example:
+            .. code-block:: python
+
+                # Keep uploads of this client under 1 MB/s
+                app.set_bandwidth_limit(upload=1024 * 1024)
+
+                # Keep all the clients together under 10 MB/s in both directions
+                app.set_bandwidth_limit(10 * 1024 * 1024, 10 * 1024 * 1024, shared=True)
+        """
+        (Client.GLOBAL_BANDWIDTH if shared else self.bandwidth).set(upload, download)
+
+    def get_transfer_stats(self) -> dict:
+        """Get live statistics about the file chunks uploaded and downloaded by this client.
+
+        Returns:
+            ``dict``: Statistics for the *upload* and *download* directions, for downloads served *direct* by the DC
+            holding the file and through a *cdn*, and for each DC (*dcs*, by DC id). Each entry holds the total of
+            *bytes* and *chunks* transferred, the current *bytes_per_second* (over the last few seconds), the number of
+            *retries* and the average round-trip time of a chunk request, *rtt*, in seconds (None if no chunk was
+            transferred yet).
+
+        Example:
+            .. code-block:: python
+
+                stats = app.get_transfer_stats()
+
+                print(stats["download"]["bytes_per_second"])
+
+                for dc_id, dc in stats["dcs"].items():
+                    print(dc_id, dc["rtt"])
+        """
+        return self.telemetry.to_dict()
+
+    def throttle(self, size: int, upload: bool = False, bucket: TokenBucket = None):
+        # Pay for a chunk on the process-wide, the client-wide and the transfer's own limit
+        for bandwidth in (Client.GLOBAL_BANDWIDTH, self.bandwidth):
+            (bandwidth.upload if upload else bandwidth.download).consume(size)
+
+        if bucket is not None:
+            bucket.consume(size)
+
     def export_session_string(self):
         """Export the current authorized session as a serialized string.
 
@@ -1227,16 +1388,38 @@ class Client(Methods, BaseClient):
         log.debug("{} started".format(name))
 
         while True:
-            packet = self.download_queue.get()
+            job = self.download_scheduler.get()
 
-            if packet is None:
+            if job is None:
                 break
 
             temp_file_path = ""
             final_file_path = ""
 
             try:
-                data, directory, file_name, done, progress, progress_args, path = packet
+                data, directory, file_name = job.data, job.directory, job.file_name
+
+                if directory is not None:
+                    final_file_path = os.path.abspath(re.sub("\\\\", "/", os.path.join(directory, file_name)))
+                    os.makedirs(directory, exist_ok=True)
+
+                if job.source is not None and os.path.isfile(job.source):
+                    # The very same file has just been downloaded for another job
+                    if directory is None:
+                        with open(job.source, "rb") as f:
+                            shutil.copyfileobj(f, file_name)
+
+                        final_file_path = file_name
+                    elif not job.named or final_file_path == job.source:
+                        final_file_path = job.source
+                    else:
+                        shutil.copyfile(job.source, final_file_path)
+
+                    size = os.path.getsize(job.source)
+                    job.update(size, size, *job.progress_args)
+                    job.result = final_file_path
+
+                    continue
 
                 temp_file_path = self.get_file(
                     media_type=data.media_type,
@@ -1252,14 +1435,28 @@ class Client(Methods, BaseClient):
                     file_ref=data.file_ref,
                     file_size=data.file_size,
                     is_big=data.is_big,
-                    progress=progress,
-                    progress_args=progress_args
+                    progress=job.update,
+                    progress_args=job.progress_args,
+                    file=file_name if directory is None else None,
+                    # Downloading next to the destination lets a failed download resume on the next attempt. Only
+                    # destinations with a stable name can be found again: generated names are random
+                    partial_file=(
+                        final_file_path + ".temp"
+                        if directory is not None and (job.named or data.file_name)
+                        else None
+                    ),
+                    refresh_file_ref=job.refresh_file_ref,
+                    bandwidth_limit=job.bandwidth_limit
                 )
 
-                if temp_file_path:
-                    final_file_path = os.path.abspath(re.sub("\\\\", "/", os.path.join(directory, file_name)))
-                    os.makedirs(directory, exist_ok=True)
+                if directory is None:
+                    # Written straight into the given file-like object
+                    final_file_path = file_name if temp_file_path else None
+                    temp_file_path = ""
+                elif temp_file_path:
                     shutil.move(temp_file_path, final_file_path)
+                else:
+                    final_file_path = ""
             except Exception as e:
                 log.error(e, exc_info=True)
 
@@ -1271,9 +1468,9 @@ class Client(Methods, BaseClient):
                 # TODO: "" or None for faulty download, which is better?
                 # os.path methods return "" in case something does not exist, I prefer this.
                 # For now let's keep None
-                path[0] = final_file_path or None
+                job.result = final_file_path or None
             finally:
-                done.set()
+                self.download_scheduler.task_done(job)
 
         log.debug("{} stopped".format(name))
 
@@ -1397,18 +1594,135 @@ class Client(Methods, BaseClient):
         if not self.is_connected:
             raise ConnectionError("Client has not been started yet")
 
-        if self.no_updates:
+        session, data = self.route(data)
+
+        r = session.send(data, retries, timeout)
+
+        self.fetch_peers(getattr(r, "users", []))
+        self.fetch_peers(getattr(r, "chats", []))
+
+        return r
+
+    def send_async(self, data: TLObject, retries: int = Session.MAX_RETRIES, timeout: float = Session.WAIT_TIMEOUT):
+        """Send raw Telegram queries without waiting for the response.
+
+        This is the non-blocking counterpart of :meth:`~Client.send`: the query is sent right away and a future is
+        returned, so that many independent queries can be in flight at the same time on a single connection.
+
+        Parameters:
+            data (``RawFunction``):
+                The API Schema function filled with proper arguments.
+
+            retries (``int``):
+                Number of retries.
+
+            timeout (``float``):
+                Timeout in seconds, applied to each attempt.
+
+        Returns:
+            :obj:`~concurrent.futures.Future`: A future that will hold the raw type response generated by the query.
+            Call ``result()`` on it to wait for the response or ``cancel()`` to drop the query.
+
+        Raises:
+            RPCError: In case of a Telegram RPC error (raised when calling ``result()`` on the future).
+
+        Example:
+            .. code-block:: python
+
+                from pyrogram.api import functions
+
+                futures = [
+                    app.send_async(functions.channels.GetFullChannel(channel=app.resolve_peer(chat)))
+                    for chat in chats
+                ]
+
+                results = [f.result() for f in futures]
+        """
+        if not self.is_connected:
+            raise ConnectionError("Client has not been started yet")
+
+        session, data = self.route(data)
+        sent = session.send_async(data, retries, timeout)
+
+        # The response is handed over once its peers are cached, which involves the storage and therefore must not
+        # happen on the event loop thread
+        future = Future()
+        future.add_done_callback(lambda f: f.cancelled() and sent.cancel())
+
+        def fetch_peers(r: TLObject):
+            try:
+                self.fetch_peers(getattr(r, "users", []))
+                self.fetch_peers(getattr(r, "chats", []))
+            except Exception as e:
+                log.error(e, exc_info=True)
+
+            future.set_result(r)
+
+        def done(sent: Future):
+            if not future.set_running_or_notify_cancel():
+                return
+
+            if sent.cancelled():
+                future.set_exception(CancelledError())
+            elif sent.exception() is not None:
+                future.set_exception(sent.exception())
+            else:
+                try:
+                    self.peers_executor.submit(fetch_peers, sent.result())
+                except RuntimeError:
+                    # The client is being disconnected: the storage is about to be closed
+                    future.set_result(sent.result())
+
+        sent.add_done_callback(done)
+
+        return future
+
+    def route(self, data: TLObject):
+        session = self.session
+
+        if self.pool_size and isinstance(data, self.POOLED_QUERIES) and self.storage.user_id():
+            session = self.get_pool_session()
+
+        # Updates are only meant to be received by the main session
+        if self.no_updates or session is not self.session:
             data = functions.InvokeWithoutUpdates(query=data)
 
         if self.takeout_id:
             data = functions.InvokeWithTakeout(takeout_id=self.takeout_id, query=data)
 
-        r = self.session.send(data, retries, timeout)
+        return session, data
 
-        self.fetch_peers(getattr(r, "users", []))
-        self.fetch_peers(getattr(r, "chats", []))
+    def get_pool_session(self) -> Session:
+        with self.session_pool_lock:
+            # Pick the least busy connection and only open a new one when all of them are busy
+            session = min(self.session_pool, key=lambda s: len(s.results), default=None)
 
-        return r
+            if session is not None and not session.results:
+                return session
+
+            if len(self.session_pool) + self.session_pool_starting >= self.pool_size:
+                # Until the first connection is up, pooled queries go through the main one
+                return session or self.session
+
+            self.session_pool_starting += 1
+
+        # Connecting takes a while: queries from other threads must not wait for it
+        try:
+            session = Session(self, self.storage.dc_id(), self.storage.auth_key(), is_media=True)
+            session.start()
+        finally:
+            with self.session_pool_lock:
+                self.session_pool_starting -= 1
+
+        with self.session_pool_lock:
+            if self.is_connected:
+                self.session_pool.append(session)
+                return session
+
+        # The client was disconnected in the meantime
+        session.stop()
+
+        return self.session
 
     def load_config(self):
         parser = ConfigParser()
@@ -1748,11 +2062,12 @@ class Client(Methods, BaseClient):
 
     def save_file(
         self,
-        path: str,
+        path: Union[str, bytes, BinaryIO, Iterable[bytes]],
         file_id: int = None,
         file_part: int = 0,
         progress: callable = None,
-        progress_args: tuple = ()
+        progress_args: tuple = (),
+        bandwidth_limit: int = None
     ):
         """Upload a file onto Telegram servers, without actually sending the message to anyone.
         Useful whenever an InputFile type is required.
@@ -1764,8 +2079,11 @@ class Client(Methods, BaseClient):
             available yet in the Client class as an easy-to-use method).
 
         Parameters:
-            path (``str``):
+            path (``str`` | ``bytes`` | ``BinaryIO`` | ``Iterable``):
                 The path of the file you want to upload that exists on your local machine.
+                You can also pass the file content directly, as a bytes-like object (``bytes``, ``bytearray``,
+                ``memoryview``), a binary file-like object or an iterable yielding chunks of bytes of any size. Content
+                of unknown length (non-seekable streams, generators) is uploaded as it's being read.
 
             file_id (``int``, *optional*):
                 In case a file part expired, pass the file_id and the file_part to retry uploading that specific chunk.
@@ -1784,6 +2102,10 @@ class Client(Methods, BaseClient):
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            bandwidth_limit (``int``, *optional*):
+                Maximum upload speed of this file, in bytes per second, on top of the limits set with
+                :meth:`~Client.set_bandwidth_limit`.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -1801,89 +2123,374 @@ class Client(Methods, BaseClient):
         Raises:
             RPCError: In case of a Telegram RPC error.
         """
-        part_size = 512 * 1024
-        file_size = os.path.getsize(path)
+        # The content comes either from a view of the whole file (bytes-like objects and memory-mapped local files),
+        # from a file object or from an iterator of chunks of any size (generators, non-seekable streams).
+        view = None
+        f = None
+        chunks = None
+        closing = []
+
+        if isinstance(path, (str, Path)):
+            name = os.path.basename(str(path))
+            file_size = os.path.getsize(path)
+        elif isinstance(path, (bytes, bytearray, memoryview)):
+            name = "file"
+            view = memoryview(path).cast("B")
+            file_size = len(view)
+        elif hasattr(path, "read"):
+            name = getattr(path, "name", None)
+            name = os.path.basename(name) if isinstance(name, str) else "file"
+
+            try:
+                f = path
+                position = f.tell()
+                file_size = f.seek(0, os.SEEK_END) - position
+                f.seek(position)
+            except (AttributeError, OSError, ValueError):
+                # Not seekable, the size is unknown until the end of the stream
+                f = None
+                file_size = None
+                chunks = iter(partial(path.read, 512 * 1024), b"")
+        else:
+            name = "file"
+            file_size = None
+            chunks = iter(path)
+
+        def split(chunks, size: int):
+            buffer = bytearray()
+
+            for chunk in chunks:
+                if not buffer and len(chunk) == size:
+                    yield chunk
+                    continue
+
+                buffer += chunk
+
+                while len(buffer) >= size:
+                    yield bytes(buffer[:size])
+                    del buffer[:size]
+
+            if buffer:
+                yield bytes(buffer)
+
+        if file_size is None:
+            part_size = 512 * 1024
+            parts = split(chunks, part_size)
+
+            # Read ahead just enough to tell whether this is a small file. Longer streams are uploaded with the big file
+            # protocol, which allows announcing the total number of parts only with the last part.
+            head = list(itertools.islice(parts, 10 * 1024 * 1024 // part_size + 1))
+
+            if len(head) <= 10 * 1024 * 1024 // part_size:
+                file_size = sum(len(chunk) for chunk in head)
+
+            parts = itertools.islice(itertools.chain(head, parts), file_part, None)
+        else:
+            # Parts must be a power of two between 1 KiB and 512 KiB. Use smaller parts for small files, so that they
+            # too can be uploaded in parallel. The part size only depends on the file size: retrying a single file_part
+            # later on will use the very same split.
+            part_size = 512 * 1024
+
+            while part_size > self.MIN_PART_SIZE and file_size < part_size * self.UPLOAD_WORKERS:
+                part_size //= 2
+
+            parts = None
 
         if file_size == 0:
             raise ValueError("File size equals to 0 B")
 
-        if file_size > 1500 * 1024 * 1024:
-            raise ValueError("Telegram doesn't support uploading files bigger than 1500 MiB")
+        too_big = ValueError("Telegram doesn't support uploading files bigger than 1500 MiB")
 
-        file_total_parts = int(math.ceil(file_size / part_size))
-        is_big = True if file_size > 10 * 1024 * 1024 else False
+        if file_size is not None and file_size > 1500 * 1024 * 1024:
+            raise too_big
+
+        file_total_parts = int(math.ceil(file_size / part_size)) if file_size is not None else -1
+        is_big = True if file_size is None or file_size > 10 * 1024 * 1024 else False
         is_missing_part = True if file_id is not None else False
         file_id = file_id or self.rnd_id()
         md5_sum = md5() if not is_big and not is_missing_part else None
 
-        session = Session(self, self.storage.dc_id(), self.storage.auth_key(), is_media=True)
-        session.start()
+        # Spread the parts over a few sessions. Only the first one may have to be started here: the others are taken
+        # only if already warm, while a cold pool grows in the background for the uploads to come
+        sessions = [self.upload_sessions.acquire()]
 
-        try:
-            with open(path, "rb") as f:
-                f.seek(part_size * file_part)
+        while len(sessions) < self.UPLOAD_SESSIONS_PER_FILE:
+            session = self.upload_sessions.acquire(block=False)
 
-                while True:
-                    chunk = f.read(part_size)
+            if session is None:
+                break
 
-                    if not chunk:
-                        if not is_big:
-                            md5_sum = "".join([hex(i)[2:].zfill(2) for i in md5_sum.digest()])
-                        break
+            sessions.append(session)
 
-                    for _ in range(3):
-                        if is_big:
-                            rpc = functions.upload.SaveBigFilePart(
-                                file_id=file_id,
-                                file_part=file_part,
-                                file_total_parts=file_total_parts,
-                                bytes=chunk
-                            )
+        dc_id = self.storage.dc_id()
+        bucket = TokenBucket(bandwidth_limit) if bandwidth_limit else None
+
+        def send_part(part: int, chunk: bytes, total_parts: int) -> Future:
+            self.throttle(len(chunk), upload=True, bucket=bucket)
+
+            if is_big:
+                rpc = functions.upload.SaveBigFilePart(
+                    file_id=file_id,
+                    file_part=part,
+                    file_total_parts=total_parts,
+                    bytes=chunk
+                )
+            else:
+                rpc = functions.upload.SaveFilePart(
+                    file_id=file_id,
+                    file_part=part,
+                    bytes=chunk
+                )
+
+            future = sessions[part % len(sessions)].send_async(rpc)
+            self.telemetry.track(future, dc_id, len(chunk), upload=True)
+
+            return future
+
+        # Up to UPLOAD_WORKERS parts are in flight at any time: future -> (file_part, chunk, total_parts, attempts)
+        pending = {}
+        uploaded = 0
+
+        try:
+            if parts is None:
+                if isinstance(path, (str, Path)):
+                    f = open(path, "rb")
+                    closing.append(f)
+
+                    # Big local files are memory-mapped: parts are slices of the mapping and are never read into memory
+                    if is_big:
+                        try:
+                            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        except (OSError, ValueError):
+                            pass
                         else:
-                            rpc = functions.upload.SaveFilePart(
-                                file_id=file_id,
-                                file_part=file_part,
-                                bytes=chunk
-                            )
+                            closing.append(m)
+                            view = memoryview(m)
 
-                        if session.send(rpc):
-                            break
-                    else:
-                        raise AssertionError("Telegram didn't accept chunk #{} of {}".format(file_part, path))
+                if view is not None:
+                    parts = (view[i:i + part_size] for i in range(part_size * file_part, file_size, part_size))
+                else:
+                    f.seek(part_size * file_part, os.SEEK_CUR)
+                    parts = split(iter(partial(f.read, part_size), b""), part_size)
 
-                    if is_missing_part:
-                        return
+            # One part of lookahead, to know which one is the last
+            ahead = next(parts, None)
 
-                    if not is_big:
+            while True:
+                while ahead is not None and len(pending) < self.UPLOAD_WORKERS:
+                    chunk, ahead = ahead, next(parts, None)
+
+                    if ahead is None and file_total_parts == -1:
+                        file_total_parts = file_part + 1
+
+                    # Streams of unknown size can only be found too big along the way
+                    if file_total_parts == -1 and file_part * part_size >= 1500 * 1024 * 1024:
+                        raise too_big
+
+                    if md5_sum is not None:
                         md5_sum.update(chunk)
 
+                    pending[send_part(file_part, chunk, file_total_parts)] = (file_part, chunk, file_total_parts, 1)
                     file_part += 1
 
-                    if progress:
-                        progress(min(file_part * part_size, file_size), file_size, *progress_args)
+                    # Only that specific chunk needs to be uploaded again
+                    if is_missing_part:
+                        ahead = None
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    part, chunk, total_parts, attempts = pending.pop(future)
+
+                    if not future.result():
+                        if attempts == 3:
+                            raise AssertionError("Telegram didn't accept chunk #{} of {}".format(part, name))
+
+                        self.telemetry.add_retry(dc_id, upload=True)
+
+                        pending[send_part(part, chunk, total_parts)] = (part, chunk, total_parts, attempts + 1)
+                        continue
+
+                    uploaded += len(chunk)
+
+                    if progress and not is_missing_part:
+                        progress(uploaded, file_size or 0, *progress_args)
+
+            if is_missing_part:
+                return
+
+            if not is_big:
+                md5_sum = "".join([hex(i)[2:].zfill(2) for i in md5_sum.digest()])
         except Client.StopTransmission:
             raise
         except Exception as e:
+            if e is too_big:
+                raise
+
             log.error(e, exc_info=True)
         else:
             if is_big:
                 return types.InputFileBig(
                     id=file_id,
                     parts=file_total_parts,
-                    name=os.path.basename(path),
+                    name=name,
 
                 )
             else:
                 return types.InputFile(
                     id=file_id,
                     parts=file_total_parts,
-                    name=os.path.basename(path),
+                    name=name,
                     md5_checksum=md5_sum
                 )
         finally:
-            session.stop()
+            for future in pending:
+                future.cancel()
 
-    def get_file(
+            for session in sessions:
+                self.upload_sessions.release(session)
+
+            pending.clear()
+            chunk = ahead = parts = None
+
+            if view is not None:
+                view.release()
+
+            for c in reversed(closing):
+                try:
+                    c.close()
+                except BufferError:
+                    # Slices of the mapping are still referenced somewhere: it will be unmapped once they're gone
+                    pass
+
+    def get_upload_cache_key(self, path: str, mime_type: str, media_type: int) -> Union[tuple, None]:
+        if not self.upload_cache or not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        identity = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+        with self.upload_hashes_lock:
+            digest = self.upload_hashes.get(identity)
+
+            if digest is not None:
+                self.upload_hashes.move_to_end(identity)
+
+        # Hash each file only once for as long as it stays unchanged on disk (and among the recently sent ones)
+        if digest is None:
+            digest = sha256()
+
+            with open(path, "rb") as f:
+                for chunk in iter(partial(f.read, 1024 * 1024), b""):
+                    digest.update(chunk)
+
+            digest = digest.hexdigest()
+
+            with self.upload_hashes_lock:
+                self.upload_hashes[identity] = digest
+
+                while len(self.upload_hashes) > self.UPLOAD_HASHES_SIZE:
+                    self.upload_hashes.popitem(last=False)
+
+        return digest, stat.st_size, mime_type or "", media_type
+
+    def get_cached_upload(self, key: Union[tuple, None]) -> Union[types.InputMediaPhoto, types.InputMediaDocument, None]:
+        if key is None:
+            return None
+
+        try:
+            file_id, file_ref = self.storage.get_cached_upload(*key)
+        except KeyError:
+            return None
+
+        try:
+            return utils.get_input_media_from_file_id(file_id, file_ref)
+        except ValueError:
+            self.storage.delete_cached_upload(*key)
+            return None
+
+    def update_cached_upload(self, key: Union[tuple, None], message: "pyrogram.Message"):
+        if key is None or message is None:
+            return
+
+        for media_type in (key[3], 2, 3, 4, 5, 8, 9, 10, 13):
+            media = getattr(message, self.MEDIA_TYPE_ID[media_type], None)
+
+            if media is not None:
+                self.storage.update_cached_upload(*key, media.file_id, media.file_ref)
+                break
+
+    def get_media_session(self, dc_id: int) -> Session:
+        with self.media_sessions_lock:
+            session = self.media_sessions.get(dc_id, None)
+
+            if session is None:
+                session = self.create_media_session(dc_id)
+                self.media_sessions[dc_id] = session
+
+            return session
+
+    def create_media_session(self, dc_id: int, is_cdn: bool = False) -> Session:
+        if dc_id == self.storage.dc_id() and not is_cdn:
+            session = Session(self, dc_id, self.storage.auth_key(), is_media=True)
+            session.start()
+
+            return session
+
+        # Auth keys for foreign DCs (and whether the authorization has already been imported there) are kept in the
+        # storage, so that the key exchange and the authorization transfer only happen once per DC.
+        try:
+            auth_key, is_imported = self.storage.get_dc_auth_key(dc_id)
+        except KeyError:
+            auth_key, is_imported, is_stored = Auth(self, dc_id).create(), False, False
+            self.storage.update_dc_auth_key(dc_id, auth_key, is_imported)
+        else:
+            is_stored = True
+
+        session = Session(self, dc_id, auth_key, is_media=True, is_cdn=is_cdn)
+
+        try:
+            session.start()
+        except AuthKeyUnregistered:
+            self.storage.delete_dc_auth_key(dc_id)
+
+            if not is_stored:
+                raise
+
+            # The stored key has been dropped by the server, start over with a brand new one
+            return self.create_media_session(dc_id, is_cdn)
+
+        if not is_cdn and not is_imported:
+            for _ in range(3):
+                exported_auth = self.send(
+                    functions.auth.ExportAuthorization(
+                        dc_id=dc_id
+                    )
+                )
+
+                try:
+                    session.send(
+                        functions.auth.ImportAuthorization(
+                            id=exported_auth.id,
+                            bytes=exported_auth.bytes
+                        )
+                    )
+                except AuthBytesInvalid:
+                    continue
+                else:
+                    break
+            else:
+                session.stop()
+                raise AuthBytesInvalid
+
+            self.storage.update_dc_auth_key(dc_id, auth_key, True)
+
+        return session
+
+    def iter_file(
         self,
         media_type: int,
         dc_id: int,
@@ -1898,224 +2505,613 @@ class Client(Methods, BaseClient):
         file_ref: str,
         file_size: int,
         is_big: bool,
-        progress: callable,
-        progress_args: tuple = ()
-    ) -> str:
-        with self.media_sessions_lock:
-            session = self.media_sessions.get(dc_id, None)
+        offset: int = 0,
+        limit: int = 0,
+        ordered: bool = True,
+        skip: dict = None,
+        refresh_file_ref: callable = None,
+        bandwidth_limit: int = None
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        """Fetch a file and yield *(offset, bytes)* pairs as the chunks arrive.
+
+        When the file size is known, up to DOWNLOAD_CONCURRENCY ranged requests are kept in flight at once, spread over
+        the DC's main media session and a few extra ones borrowed from a per-DC pool. With *ordered* the chunks are
+        yielded in file order, otherwise as soon as they arrive. *offset* and *limit* restrict the download to a range
+        of bytes (limit 0 means up to the end of the file).
+
+        *skip* maps the offsets of chunks already downloaded to their length: those are neither fetched nor yielded
+        again. *refresh_file_ref* is called to get a fresh file reference in case the current one expires.
+        *bandwidth_limit* caps the speed of this download, in bytes per second.
+        """
+        session = self.get_media_session(dc_id)
+        bucket = TokenBucket(bandwidth_limit) if bandwidth_limit else None
 
-            if session is None:
-                if dc_id != self.storage.dc_id():
-                    session = Session(self, dc_id, Auth(self, dc_id).create(), is_media=True)
-                    session.start()
-
-                    for _ in range(3):
-                        exported_auth = self.send(
-                            functions.auth.ExportAuthorization(
-                                dc_id=dc_id
-                            )
-                        )
+        # Where the chunks come from, for the telemetry: the file's DC or a CDN
+        source_dc_id = dc_id
+        is_cdn = False
+
+        def get_location(file_ref: str):
+            return utils.get_input_file_location(
+                media_type, document_id, access_hash, thumb_size, peer_id, peer_type, peer_access_hash,
+                volume_id, local_id, is_big, file_ref
+            )
+
+        location = get_location(file_ref)
+
+        chunk_size = self.DOWNLOAD_CHUNK_SIZE
+        start = offset - offset % chunk_size
+        stop = offset + limit if limit else 0
+
+        # Requests are only split across a known range. Files of unknown size are fetched one chunk after another.
+        bound = (min(file_size, stop) if stop else file_size) if file_size else 0
+        window = self.DOWNLOAD_CONCURRENCY if bound else 1
+
+        skip = skip or {}
+        first = start
+
+        while first in skip:
+            if skip[first] < chunk_size:
+                # The whole file has been downloaded already
+                return
+
+            first += chunk_size
+
+        # Extra sessions borrowed from the DCs' download pools: (pool, session)
+        borrowed = []
+
+        # The location each in-flight request has been made with: future -> location
+        sent = {}
+
+        def refresh_location(stale) -> bool:
+            nonlocal location
+
+            if stale is None:
+                return False
+
+            # Another failed request already took care of it
+            if stale is not location:
+                return True
+
+            if refresh_file_ref is None:
+                return False
+
+            fresh = get_location(refresh_file_ref())
+
+            if getattr(fresh, "file_reference", None) == getattr(location, "file_reference", None):
+                return False
+
+            log.info("File reference refreshed")
+            location = fresh
+
+            return True
+
+        def get_sessions(primary: Session, dc_id: int, is_cdn: bool = False) -> list:
+            sessions = [primary]
+
+            # A single chunk, there's nothing to parallelize
+            if bound - start <= chunk_size:
+                return sessions
+
+            with self.media_sessions_lock:
+                pool = self.download_sessions.get(dc_id, None)
+
+                if pool is None:
+                    pool = SessionPool(
+                        lambda: self.create_media_session(dc_id, is_cdn=is_cdn),
+                        self.DOWNLOAD_SESSIONS,
+                        self.MEDIA_SESSION_IDLE_TIMEOUT
+                    )
+                    self.download_sessions[dc_id] = pool
+
+            # Extra sessions are only taken if already warm: a cold pool grows in the background instead of delaying
+            # the first chunk
+            while len(sessions) <= self.DOWNLOAD_SESSIONS:
+                extra = pool.acquire(block=False)
+
+                if extra is None:
+                    break
+
+                borrowed.append((pool, extra))
+                sessions.append(extra)
+
+            return sessions
+
+        def chunks(request: callable, process: callable, pending: dict = None):
+            # The file ends at the first chunk shorter than chunk_size. Arrived chunks wait in ready until their turn
+            # comes (ordered) and count towards the window, so that memory usage stays bounded.
+            pending = pending or {}  # future -> offset
+            next_offset = max(pending.values(), default=first - chunk_size) + chunk_size
+            ready = {}  # offset -> bytes
+            cursor = start
+            end = None
+
+            try:
+                while True:
+                    while (
+                        end is None
+                        and len(pending) + len(ready) < window
+                        and (not stop or next_offset < stop)
+                        and (next_offset < bound or not pending)
+                    ):
+                        if next_offset in skip:
+                            if skip[next_offset] < chunk_size:
+                                end = next_offset + skip[next_offset]
+
+                            next_offset += chunk_size
+                            continue
+
+                        pending[request(next_offset)] = next_offset
+                        next_offset += chunk_size
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    # A failed request still lets the chunks that already arrived through, before failing as well
+                    error = None
+
+                    for future in sorted(done, key=pending.get):
+                        chunk_offset = pending.pop(future)
+                        stale = sent.pop(future, None)
 
                         try:
-                            session.send(
-                                functions.auth.ImportAuthorization(
-                                    id=exported_auth.id,
-                                    bytes=exported_auth.bytes
-                                )
-                            )
-                        except AuthBytesInvalid:
+                            result = future.result()
+                        except FileReferenceExpired as e:
+                            if refresh_location(stale):
+                                self.telemetry.add_retry(source_dc_id, is_cdn=is_cdn)
+                                pending[request(chunk_offset)] = chunk_offset
+                            else:
+                                error = error or e
+
                             continue
-                        else:
+                        except Exception as e:
+                            error = error or e
+                            continue
+
+                        chunk = process(result, chunk_offset)
+
+                        if chunk is None:
+                            self.telemetry.add_retry(source_dc_id, is_cdn=is_cdn)
+                            pending[request(chunk_offset)] = chunk_offset
+                            continue
+
+                        # Chunks are paid for as they arrive, which holds back the requests that follow
+                        self.throttle(len(chunk), bucket=bucket)
+
+                        if end is not None and chunk_offset >= end:
+                            continue
+
+                        if len(chunk) < chunk_size:
+                            end = chunk_offset + len(chunk)
+
+                        ready[chunk_offset] = chunk
+
+                    while ready:
+                        while cursor in skip:
+                            cursor += chunk_size
+
+                        chunk_offset = cursor if ordered else min(ready)
+
+                        if chunk_offset not in ready:
                             break
-                    else:
-                        session.stop()
-                        raise AuthBytesInvalid
-                else:
-                    session = Session(self, dc_id, self.storage.auth_key(), is_media=True)
-                    session.start()
 
-                self.media_sessions[dc_id] = session
+                        chunk = ready.pop(chunk_offset)
+                        cursor = chunk_offset + chunk_size
 
-        file_ref = utils.decode_file_ref(file_ref)
+                        # Trim the first and last chunks to the requested range
+                        head = max(offset - chunk_offset, 0)
+                        tail = min(len(chunk), stop - chunk_offset) if stop else len(chunk)
 
-        if media_type == 1:
-            if peer_type == "user":
-                peer = types.InputPeerUser(
-                    user_id=peer_id,
-                    access_hash=peer_access_hash
-                )
-            elif peer_type == "chat":
-                peer = types.InputPeerChat(
-                    chat_id=peer_id
-                )
-            else:
-                peer = types.InputPeerChannel(
-                    channel_id=peer_id,
-                    access_hash=peer_access_hash
-                )
+                        if head or tail < len(chunk):
+                            chunk = chunk[head:tail]
 
-            location = types.InputPeerPhotoFileLocation(
-                peer=peer,
-                volume_id=volume_id,
-                local_id=local_id,
-                big=is_big or None
-            )
-        elif media_type in (0, 2):
-            location = types.InputPhotoFileLocation(
-                id=document_id,
-                access_hash=access_hash,
-                file_reference=file_ref,
-                thumb_size=thumb_size
-            )
-        elif media_type == 14:
-            location = types.InputDocumentFileLocation(
-                id=document_id,
-                access_hash=access_hash,
-                file_reference=file_ref,
-                thumb_size=thumb_size
-            )
-        else:
-            location = types.InputDocumentFileLocation(
-                id=document_id,
-                access_hash=access_hash,
-                file_reference=file_ref,
-                thumb_size=""
-            )
+                        if chunk:
+                            yield chunk_offset + head, chunk
 
-        limit = 1024 * 1024
-        offset = 0
-        file_name = ""
+                    if error is not None:
+                        raise error
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        def get_first():
+            sent_at = time.monotonic()
 
-        try:
             r = session.send(
                 functions.upload.GetFile(
                     location=location,
-                    offset=offset,
-                    limit=limit
+                    offset=first,
+                    limit=chunk_size
                 )
             )
 
             if isinstance(r, types.upload.File):
-                with tempfile.NamedTemporaryFile("wb", delete=False) as f:
-                    file_name = f.name
+                self.telemetry.add_chunk(dc_id, len(r.bytes), time.monotonic() - sent_at)
 
-                    while True:
-                        chunk = r.bytes
+            return r
 
-                        if not chunk:
-                            break
+        try:
+            try:
+                r = get_first()
+            except FileReferenceExpired:
+                if not refresh_location(location):
+                    raise
 
-                        f.write(chunk)
+                self.telemetry.add_retry(dc_id)
+                r = get_first()
 
-                        offset += limit
+            if isinstance(r, types.upload.File):
+                sessions = get_sessions(session, dc_id)
+
+                def request(offset: int) -> Future:
+                    future = sessions[offset // chunk_size % len(sessions)].send_async(
+                        functions.upload.GetFile(
+                            location=location,
+                            offset=offset,
+                            limit=chunk_size
+                        )
+                    )
 
-                        if progress:
-                            progress(
-                                min(offset, file_size)
-                                if file_size != 0
-                                else offset,
-                                file_size,
-                                *progress_args
-                            )
+                    sent[future] = location
+                    self.telemetry.track(future, dc_id)
 
-                        r = session.send(
-                            functions.upload.GetFile(
-                                location=location,
-                                offset=offset,
-                                limit=limit
-                            )
-                        )
+                    return future
+
+                done = Future()
+                done.set_result(r)
+
+                yield from chunks(request, lambda r, offset: r.bytes, {done: first})
 
             elif isinstance(r, types.upload.FileCdnRedirect):
+                source_dc_id = r.dc_id
+                is_cdn = True
+
                 with self.media_sessions_lock:
                     cdn_session = self.media_sessions.get(r.dc_id, None)
 
                     if cdn_session is None:
-                        cdn_session = Session(self, r.dc_id, Auth(self, r.dc_id).create(), is_media=True, is_cdn=True)
+                        cdn_session = self.create_media_session(r.dc_id, is_cdn=True)
+                        self.media_sessions[r.dc_id] = cdn_session
 
-                        cdn_session.start()
+                cdn_sessions = get_sessions(cdn_session, r.dc_id, is_cdn=True)
 
-                        self.media_sessions[r.dc_id] = cdn_session
+                # Hashes of the file parts, by offset. A single GetCdnFileHashes answer usually covers more than one
+                # chunk: hashes are requested ahead of time, only for parts that aren't (about to be) known yet.
+                hashes = {h.offset: h for h in r.file_hashes}
+                hashes_requests = {}  # offset -> future
+                hashes_lock = threading.Lock()
+                hashes_span = max(sum(h.limit for h in r.file_hashes), 1)
 
-                try:
-                    with tempfile.NamedTemporaryFile("wb", delete=False) as f:
-                        file_name = f.name
-
-                        while True:
-                            r2 = cdn_session.send(
-                                functions.upload.GetCdnFile(
-                                    file_token=r.file_token,
-                                    offset=offset,
-                                    limit=limit
-                                )
+                def add_hashes(new_hashes: list):
+                    nonlocal hashes_span
+
+                    with hashes_lock:
+                        for h in new_hashes:
+                            hashes[h.offset] = h
+
+                        hashes_span = max(hashes_span, sum(h.limit for h in new_hashes))
+
+                def prefetch_hashes(offset: int):
+                    with hashes_lock:
+                        if offset in hashes or any(o <= offset < o + hashes_span for o in hashes_requests):
+                            return
+
+                        future = session.send_async(
+                            functions.upload.GetCdnFileHashes(
+                                file_token=r.file_token,
+                                offset=offset
                             )
+                        )
 
-                            if isinstance(r2, types.upload.CdnFileReuploadNeeded):
-                                try:
-                                    session.send(
-                                        functions.upload.ReuploadCdnFile(
-                                            file_token=r.file_token,
-                                            request_token=r2.request_token
-                                        )
-                                    )
-                                except VolumeLocNotFound:
-                                    break
-                                else:
-                                    continue
+                        hashes_requests[offset] = future
 
-                            chunk = r2.bytes
+                    def done(future):
+                        with hashes_lock:
+                            hashes_requests.pop(offset, None)
 
-                            # https://core.telegram.org/cdn#decrypting-files
-                            decrypted_chunk = AES.ctr256_decrypt(
-                                chunk,
-                                r.encryption_key,
-                                bytearray(
-                                    r.encryption_iv[:-4]
-                                    + (offset // 16).to_bytes(4, "big")
+                        if not future.cancelled() and future.exception() is None:
+                            add_hashes(future.result())
+
+                    future.add_done_callback(done)
+
+                def get_hashes(offset: int, length: int) -> list:
+                    result = []
+                    position = offset
+
+                    while position < offset + length:
+                        with hashes_lock:
+                            h = hashes.get(position, None)
+                            requests = list(hashes_requests.values())
+
+                        if h is not None:
+                            result.append(h)
+                            position += h.limit
+                        elif requests:
+                            wait(requests)
+                        else:
+                            add_hashes(
+                                session.send(
+                                    functions.upload.GetCdnFileHashes(
+                                        file_token=r.file_token,
+                                        offset=position
+                                    )
                                 )
                             )
 
-                            hashes = session.send(
-                                functions.upload.GetCdnFileHashes(
-                                    file_token=r.file_token,
-                                    offset=offset
+                            assert position in hashes, "Missing CDN hash for offset {}".format(position)
+
+                    return result
+
+                def decrypt(chunk: bytes, offset: int) -> bytes:
+                    if not chunk:
+                        return chunk
+
+                    # https://core.telegram.org/cdn#decrypting-files
+                    decrypted_chunk = AES.ctr256_decrypt(
+                        chunk,
+                        r.encryption_key,
+                        bytearray(
+                            r.encryption_iv[:-4]
+                            + (offset // 16).to_bytes(4, "big")
+                        )
+                    )
+
+                    view = memoryview(decrypted_chunk)
+
+                    # https://core.telegram.org/cdn#verifying-files
+                    for h in get_hashes(offset, len(decrypted_chunk)):
+                        cdn_chunk = view[h.offset - offset:h.offset - offset + h.limit]
+                        assert h.hash == sha256(cdn_chunk).digest(), "Invalid CDN hash part at {}".format(h.offset)
+
+                    return decrypted_chunk
+
+                # Decryption and verification run in worker threads, so that chunks keep being consumed meanwhile
+                executor = ThreadPoolExecutor(self.DOWNLOAD_CONCURRENCY)
+
+                def request(offset: int) -> Future:
+                    prefetch_hashes(offset)
+
+                    # Completed once the chunk has been fetched and verified. Marked as running right away: it can't be
+                    # cancelled, it just gets ignored in case the download stops earlier.
+                    result = Future()
+                    result.set_running_or_notify_cancel()
+
+                    def fetched(future):
+                        if future.cancelled():
+                            result.set_exception(CancelledError())
+                        elif future.exception() is not None:
+                            result.set_exception(future.exception())
+                        elif isinstance(future.result(), types.upload.CdnFileReuploadNeeded):
+                            result.set_result(future.result())
+                        else:
+                            try:
+                                executor.submit(decrypt, future.result().bytes, offset).add_done_callback(verified)
+                            except RuntimeError as e:
+                                # The executor is shut down, the download is over
+                                result.set_exception(e)
+
+                    def verified(future):
+                        if future.exception() is not None:
+                            result.set_exception(future.exception())
+                        else:
+                            result.set_result(future.result())
+
+                    future = cdn_sessions[offset // chunk_size % len(cdn_sessions)].send_async(
+                        functions.upload.GetCdnFile(
+                            file_token=r.file_token,
+                            offset=offset,
+                            limit=chunk_size
+                        )
+                    )
+
+                    self.telemetry.track(future, r.dc_id, is_cdn=True)
+                    future.add_done_callback(fetched)
+
+                    return result
+
+                def process(r2, offset: int) -> bytes or None:
+                    if isinstance(r2, types.upload.CdnFileReuploadNeeded):
+                        try:
+                            add_hashes(
+                                session.send(
+                                    functions.upload.ReuploadCdnFile(
+                                        file_token=r.file_token,
+                                        request_token=r2.request_token
+                                    )
                                 )
                             )
+                        except VolumeLocNotFound:
+                            return b""
+                        else:
+                            return None
 
-                            # https://core.telegram.org/cdn#verifying-files
-                            for i, h in enumerate(hashes):
-                                cdn_chunk = decrypted_chunk[h.limit * i: h.limit * (i + 1)]
-                                assert h.hash == sha256(cdn_chunk).digest(), "Invalid CDN hash part {}".format(i)
+                    return r2
 
-                            f.write(decrypted_chunk)
+                try:
+                    yield from chunks(request, process)
+                finally:
+                    executor.shutdown(wait=False)
+
+                    for future in list(hashes_requests.values()):
+                        future.cancel()
+        except AuthKeyUnregistered:
+            if dc_id != self.storage.dc_id():
+                # The authorization imported on this DC is gone: drop the sessions and import it again next time
+                with self.media_sessions_lock:
+                    if self.media_sessions.get(dc_id) is session:
+                        self.media_sessions.pop(dc_id).stop()
 
-                            offset += limit
+                    pool = self.download_sessions.pop(dc_id, None)
 
-                            if progress:
-                                progress(
-                                    min(offset, file_size)
-                                    if file_size != 0
-                                    else offset,
-                                    file_size,
-                                    *progress_args
-                                )
+                if pool is not None:
+                    pool.close()
 
-                            if len(chunk) < limit:
-                                break
-                except Exception as e:
-                    raise e
+                self.storage.update_dc_auth_key(dc_id, session.auth_key, False)
+
+            raise
+        finally:
+            for pool, extra in borrowed:
+                pool.release(extra)
+
+    def get_file(
+        self,
+        media_type: int,
+        dc_id: int,
+        document_id: int,
+        access_hash: int,
+        thumb_size: str,
+        peer_id: int,
+        peer_type: str,
+        peer_access_hash: int,
+        volume_id: int,
+        local_id: int,
+        file_ref: str,
+        file_size: int,
+        is_big: bool,
+        progress: callable,
+        progress_args: tuple = (),
+        file: BinaryIO = None,
+        partial_file: str = None,
+        refresh_file_ref: callable = None,
+        bandwidth_limit: int = None
+    ) -> Union[str, BinaryIO]:
+        file_size = file_size or 0
+
+        # With a partial_file, the chunks written so far are recorded in a checkpoint next to it. If the download fails
+        # both are kept, and the next download of the same file into the same partial_file resumes from there.
+        identity = [media_type, dc_id, document_id, access_hash, thumb_size, volume_id, local_id, is_big, file_size]
+        checkpoint = partial_file + ".json" if partial_file else None
+        written = {}  # chunk offset -> length
+
+        if checkpoint:
+            try:
+                with open(checkpoint) as f:
+                    state = json.load(f)
+
+                if (
+                    state["file"] == identity
+                    and state["chunk_size"] == self.DOWNLOAD_CHUNK_SIZE
+                    and os.path.exists(partial_file)
+                ):
+                    written = {int(offset): length for offset, length in state["chunks"].items()}
+                    log.info("Resuming download of {} from {} chunks".format(partial_file, len(written)))
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        def save_checkpoint():
+            temp = checkpoint + ".temp"
+
+            with open(temp, "w") as f:
+                json.dump(dict(file=identity, chunk_size=self.DOWNLOAD_CHUNK_SIZE, chunks=written), f)
+
+            os.replace(temp, checkpoint)
+
+        file_name = ""
+        downloaded = sum(written.values())
+        saved_at = time.monotonic()
+
+        chunks = self.iter_file(
+            media_type=media_type,
+            dc_id=dc_id,
+            document_id=document_id,
+            access_hash=access_hash,
+            thumb_size=thumb_size,
+            peer_id=peer_id,
+            peer_type=peer_type,
+            peer_access_hash=peer_access_hash,
+            volume_id=volume_id,
+            local_id=local_id,
+            file_ref=file_ref,
+            file_size=file_size,
+            is_big=is_big,
+            # File-like objects are written sequentially, files on disk at each chunk's offset
+            ordered=file is not None,
+            skip=written,
+            refresh_file_ref=refresh_file_ref,
+            bandwidth_limit=bandwidth_limit
+        )
+
+        try:
+            if file is None:
+                if partial_file:
+                    file_name = partial_file
+                    f = open(partial_file, "r+b" if written else "wb")
+                else:
+                    f = tempfile.NamedTemporaryFile("wb", delete=False)
+                    file_name = f.name
+
+                with f:
+                    if file_size:
+                        f.truncate(file_size)
+
+                    for offset, chunk in chunks:
+                        f.seek(offset)
+                        f.write(chunk)
+                        downloaded += len(chunk)
+
+                        if checkpoint:
+                            written[offset] = len(chunk)
+
+                            # Saved every few seconds rather than after each chunk, which would rewrite it over and
+                            # over for big files. The chunks recorded so far must reach the file first
+                            if time.monotonic() - saved_at >= self.DOWNLOAD_CHECKPOINT_INTERVAL:
+                                f.flush()
+                                save_checkpoint()
+                                saved_at = time.monotonic()
+
+                        if progress:
+                            progress(
+                                min(downloaded, file_size)
+                                if file_size != 0
+                                else downloaded,
+                                file_size,
+                                *progress_args
+                            )
+
+                    f.truncate(downloaded)
+            else:
+                for _, chunk in chunks:
+                    file.write(chunk)
+                    downloaded += len(chunk)
+
+                    if progress:
+                        progress(
+                            min(downloaded, file_size)
+                            if file_size != 0
+                            else downloaded,
+                            file_size,
+                            *progress_args
+                        )
         except Exception as e:
             if not isinstance(e, Client.StopTransmission):
                 log.error(e, exc_info=True)
 
-            try:
-                os.remove(file_name)
-            except OSError:
-                pass
+            # Failed downloads into a partial file can be resumed later on, unless they were stopped on purpose
+            if not checkpoint or isinstance(e, Client.StopTransmission):
+                for path in (file_name, checkpoint):
+                    try:
+                        os.remove(path)
+                    except (OSError, TypeError):
+                        pass
+            elif written:
+                # The file is closed by now: every chunk recorded is in it
+                try:
+                    save_checkpoint()
+                except OSError as error:
+                    log.warning("Unable to save the download checkpoint: {}".format(error))
 
             return ""
         else:
-            return file_name
+            if checkpoint:
+                try:
+                    os.remove(checkpoint)
+                except OSError:
+                    pass
+
+            return file if file is not None else file_name
+        finally:
+            chunks.close()
 
     def guess_mime_type(self, filename: str):
         extension = os.path.splitext(filename)[1]
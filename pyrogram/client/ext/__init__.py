@@ -16,8 +16,11 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+from .bandwidth import TokenBucket, BandwidthLimit, Telemetry
 from .base_client import BaseClient
+from .bulk_transfer import BulkTransfer, Journal
 from .dispatcher import Dispatcher
+from .download_scheduler import DownloadScheduler, DownloadJob
 from .emoji import Emoji
 from .file_data import FileData
 from .syncer import Syncer
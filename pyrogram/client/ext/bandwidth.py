@@ -0,0 +1,184 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Lock
+
+
+class TokenBucket:
+    """Caps a flow of bytes to *rate* bytes per second, letting bursts of up to one second worth of bytes through.
+
+    A rate of 0 means no limit. Callers pay for the bytes they are about to send (or receive) with :meth:`consume`,
+    which blocks until the bucket holds enough tokens. A single chunk may cost more than the bucket can hold: the
+    bucket goes into debt and later callers wait for it to be paid off, so that the average rate is kept anyway.
+    """
+
+    def __init__(self, rate: int = 0):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = Lock()
+
+    def consume(self, amount: int):
+        if not self.rate:
+            return
+
+        # Waiting while holding the lock makes the callers take turns
+        with self.lock:
+            rate = self.rate
+
+            if not rate:
+                return
+
+            now = time.monotonic()
+            self.tokens = min(self.tokens + (now - self.updated_at) * rate, rate)
+            self.updated_at = now
+            self.tokens -= amount
+
+            if self.tokens < 0:
+                time.sleep(-self.tokens / rate)
+
+
+class BandwidthLimit:
+    """A pair of token buckets, for the bytes going up and the bytes coming down."""
+
+    def __init__(self, upload: int = 0, download: int = 0):
+        self.upload = TokenBucket(upload)
+        self.download = TokenBucket(download)
+
+    def set(self, upload: int = None, download: int = None):
+        if upload is not None:
+            self.upload.rate = upload
+
+        if download is not None:
+            self.download.rate = download
+
+
+class TransferCounters:
+    """Chunks transferred, retries and round-trip times of a class of requests."""
+
+    # Seconds of history the current speed is computed on
+    WINDOW = 5
+
+    def __init__(self):
+        self.bytes = 0
+        self.chunks = 0
+        self.retries = 0
+        self.rtt = None  # Exponential moving average, in seconds
+        self.recent = deque()  # (time, bytes)
+
+    def add(self, size: int, rtt: float, now: float):
+        self.bytes += size
+        self.chunks += 1
+        self.rtt = rtt if self.rtt is None else self.rtt * 0.8 + rtt * 0.2
+        self.recent.append((now, size))
+
+        self.prune(now)
+
+    def prune(self, now: float):
+        while self.recent and self.recent[0][0] < now - TransferCounters.WINDOW:
+            self.recent.popleft()
+
+    def to_dict(self, now: float) -> dict:
+        self.prune(now)
+
+        return dict(
+            bytes=self.bytes,
+            bytes_per_second=sum(size for _, size in self.recent) / TransferCounters.WINDOW,
+            chunks=self.chunks,
+            retries=self.retries,
+            rtt=self.rtt
+        )
+
+
+class Telemetry:
+    """Live statistics of the file chunks a client uploads and downloads.
+
+    Chunks are accounted per direction, per DC, and for downloads also per source: straight from the DC holding the
+    file or through a CDN.
+    """
+
+    def __init__(self):
+        self.upload = TransferCounters()
+        self.download = TransferCounters()
+        self.direct = TransferCounters()
+        self.cdn = TransferCounters()
+        self.dcs = {}  # dc_id -> TransferCounters
+        self.lock = Lock()
+
+    def get_counters(self, dc_id: int, upload: bool, is_cdn: bool) -> list:
+        if dc_id not in self.dcs:
+            self.dcs[dc_id] = TransferCounters()
+
+        if upload:
+            return [self.upload, self.dcs[dc_id]]
+
+        return [self.download, self.cdn if is_cdn else self.direct, self.dcs[dc_id]]
+
+    def add_chunk(self, dc_id: int, size: int, rtt: float, upload: bool = False, is_cdn: bool = False):
+        now = time.monotonic()
+
+        with self.lock:
+            for counters in self.get_counters(dc_id, upload, is_cdn):
+                counters.add(size, rtt, now)
+
+    def add_retry(self, dc_id: int, upload: bool = False, is_cdn: bool = False):
+        with self.lock:
+            for counters in self.get_counters(dc_id, upload, is_cdn):
+                counters.retries += 1
+
+    def track(self, future: Future, dc_id: int, size: int = None, upload: bool = False, is_cdn: bool = False):
+        """Account for the chunk a request is about to transfer, once its response arrives."""
+        sent_at = time.monotonic()
+
+        def done(future: Future):
+            if future.cancelled() or future.exception() is not None:
+                return
+
+            r = future.result()
+
+            if upload:
+                # Parts not accepted by the server are sent again, and counted as retries from there
+                if not r:
+                    return
+
+                chunk_size = size
+            else:
+                # CDN re-upload requests carry no bytes
+                if not hasattr(r, "bytes"):
+                    return
+
+                chunk_size = len(r.bytes)
+
+            self.add_chunk(dc_id, chunk_size, time.monotonic() - sent_at, upload, is_cdn)
+
+        future.add_done_callback(done)
+
+    def to_dict(self) -> dict:
+        now = time.monotonic()
+
+        with self.lock:
+            return dict(
+                upload=self.upload.to_dict(now),
+                download=self.download.to_dict(now),
+                direct=self.direct.to_dict(now),
+                cdn=self.cdn.to_dict(now),
+                dcs={dc_id: counters.to_dict(now) for dc_id, counters in sorted(self.dcs.items())}
+            )
@@ -20,11 +20,16 @@ import os
 import platform
 import re
 import sys
+from collections import OrderedDict
 from pathlib import Path
 from queue import Queue
 from threading import Lock
 
 from pyrogram import __version__
+from pyrogram.api import functions
+from pyrogram.errors import FileIdInvalid, FileReferenceEmpty, FileReferenceExpired, FileReferenceInvalid, MediaEmpty
+from .bandwidth import BandwidthLimit, Telemetry
+from .download_scheduler import DownloadScheduler
 from ..parser import Parser
 from ...session.internals import MsgId
 
@@ -52,7 +57,27 @@ class BaseClient:
     INVITE_LINK_RE = re.compile(r"^(?:https?://)?(?:www\.)?(?:t(?:elegram)?\.(?:org|me|dog)/joinchat/)([\w-]+)$")
     DIALOGS_AT_ONCE = 100
     UPDATES_WORKERS = 4
-    DOWNLOAD_WORKERS = 1
+    DOWNLOAD_WORKERS = 4
+    DOWNLOAD_PER_DC = 2
+    DOWNLOAD_INTERACTIVE_SIZE = 1024 * 1024
+    DOWNLOAD_CACHE_TIME = 0
+    DOWNLOAD_MANY_WINDOW = 32
+    DOWNLOAD_MANY_SMALL_SIZE = 256 * 1024
+    POOL_SIZE = 0
+    UPLOAD_SESSIONS = 4
+    UPLOAD_SESSIONS_PER_FILE = 2
+    UPLOAD_WORKERS = 4
+    MIN_PART_SIZE = 64 * 1024
+    MEDIA_GROUP_WORKERS = 4
+    UPLOAD_MANY_WORKERS = 4
+    UPLOAD_HASHES_SIZE = 1024
+    DOWNLOAD_SESSIONS = 2
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    DOWNLOAD_CHECKPOINT_INTERVAL = 5
+    DOWNLOAD_CONCURRENCY = 4
+    MEDIA_SESSION_IDLE_TIMEOUT = 60
+    MEDIA_SERVER_CACHE_SIZE = 64
+    MEDIA_SERVER_FILES = 1024
     OFFLINE_SLEEP = 900
     WORKERS = 4
     WORKDIR = PARENT_DIR
@@ -60,6 +85,30 @@ class BaseClient:
 
     PARSE_MODES = ["combined", "markdown", "md", "html", None]
 
+    # Bandwidth shared by every client in the process
+    GLOBAL_BANDWIDTH = BandwidthLimit()
+
+    # Errors meaning that a previously uploaded file can't be sent again by its file_id
+    UPLOAD_CACHE_ERRORS = (FileIdInvalid, FileReferenceEmpty, FileReferenceExpired, FileReferenceInvalid, MediaEmpty)
+
+    # Slow or bulk queries which are spread over the connection pool (if any), so that they don't hold up the main
+    # session, which keeps receiving updates and serving latency-sensitive queries.
+    POOLED_QUERIES = (
+        functions.messages.GetHistory,
+        functions.messages.Search,
+        functions.messages.SearchGlobal,
+        functions.messages.GetMessages,
+        functions.messages.GetDialogs,
+        functions.messages.GetPeerDialogs,
+        functions.messages.GetFullChat,
+        functions.messages.GetMessagesViews,
+        functions.channels.GetMessages,
+        functions.channels.GetParticipants,
+        functions.channels.GetFullChannel,
+        functions.contacts.GetContacts,
+        functions.photos.GetUserPhotos
+    )
+
     MEDIA_TYPE_ID = {
         0: "photo_thumbnail",
         1: "chat_photo",
@@ -99,8 +148,22 @@ class BaseClient:
         self.parse_mode = "combined"
 
         self.session = None
+        self.session_pool = []
+        self.session_pool_starting = 0  # Connections of the pool being started
+        self.session_pool_lock = Lock()
         self.media_sessions = {}
         self.media_sessions_lock = Lock()
+        self.download_sessions = {}
+        self.upload_sessions = None
+        self.upload_hashes = OrderedDict()  # (path, size, mtime) -> content hash, least recently used first
+        self.upload_hashes_lock = Lock()
+        self.media_server = None
+
+        self.bandwidth = BandwidthLimit()
+        self.telemetry = Telemetry()
+
+        # Caches the peers of send_async responses, away from the event loop shared by every session
+        self.peers_executor = None
 
         self.is_connected = None
         self.is_initialized = None
@@ -109,7 +172,9 @@ class BaseClient:
 
         self.updates_queue = Queue()
         self.updates_workers_list = []
-        self.download_queue = Queue()
+        self.download_scheduler = DownloadScheduler(
+            self.DOWNLOAD_WORKERS, self.DOWNLOAD_PER_DC, self.DOWNLOAD_CACHE_TIME
+        )
         self.download_workers_list = []
 
         self.disconnect_handler = None
@@ -129,6 +194,24 @@ class BaseClient:
     def save_file(self, *args, **kwargs):
         pass
 
+    def iter_file(self, *args, **kwargs):
+        pass
+
+    def get_media_session(self, *args, **kwargs):
+        pass
+
+    def throttle(self, *args, **kwargs):
+        pass
+
+    def get_upload_cache_key(self, *args, **kwargs):
+        pass
+
+    def get_cached_upload(self, *args, **kwargs):
+        pass
+
+    def update_cached_upload(self, *args, **kwargs):
+        pass
+
     def get_messages(self, *args, **kwargs):
         pass
 
@@ -0,0 +1,109 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+class BulkTransfer:
+    """A batch of transfers started with :meth:`~Client.download_many` or :meth:`~Client.upload_many`.
+
+    Iterate over it to get *(item, result)* pairs in the order the transfers complete. Nothing is transferred until
+    the iteration starts, and the items are consumed lazily: only a bounded number of them is in flight at any time.
+    Counters are kept up to date along the way; call :meth:`stats` for a summary.
+    """
+
+    def __init__(self, run: callable):
+        self.started_at = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.in_flight = 0
+        self.bytes = 0
+
+        self.results = run(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.results)
+
+    def close(self):
+        """Stop the batch: transfers which haven't started yet are dropped."""
+        self.results.close()
+
+    @property
+    def bytes_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def stats(self) -> dict:
+        return dict(
+            completed=self.completed,
+            failed=self.failed,
+            skipped=self.skipped,
+            in_flight=self.in_flight,
+            bytes=self.bytes,
+            bytes_per_second=self.bytes_per_second
+        )
+
+    def __repr__(self):
+        return "<BulkTransfer {completed} done, {failed} failed, {skipped} skipped, {in_flight} in flight>".format(
+            **self.stats()
+        )
+
+
+class Journal:
+    """Append-only record of the items of a batch already transferred, used to resume the batch where it stopped.
+
+    Each line of the file is a JSON object holding a key and a value. A line left truncated by a crash is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    self.entries[entry["key"]] = entry["value"]
+        except FileNotFoundError:
+            pass
+
+        self.file = open(path, "a", encoding="utf-8")
+
+    def get(self, key: str):
+        return self.entries.get(key)
+
+    def add(self, key: str, value):
+        self.entries[key] = value
+        self.file.write(json.dumps(dict(key=key, value=value)) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
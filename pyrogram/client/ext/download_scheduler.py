@@ -0,0 +1,334 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+from collections import OrderedDict, deque
+from threading import Condition, Event, Lock
+from typing import List, Union
+
+from .file_data import FileData
+
+log = logging.getLogger(__name__)
+
+
+class DownloadJob:
+    """A file waiting to be downloaded, or being downloaded, by a download worker."""
+
+    QUEUED = "queued"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+
+    def __init__(
+        self, data: FileData, directory: Union[str, None], file_name, progress: callable, progress_args: tuple,
+        refresh_file_ref: callable, priority: str, chat_id: int = None, named: bool = True,
+        bandwidth_limit: int = None
+    ):
+        self.data = data
+        self.directory = directory
+        self.file_name = file_name
+        self.progress = progress
+        self.progress_args = progress_args
+        self.refresh_file_ref = refresh_file_ref
+        self.priority = priority
+        self.chat_id = chat_id
+        self.named = named  # False in case the file name was picked automatically
+        self.bandwidth_limit = bandwidth_limit
+
+        # Jobs for the same file requested while this one is queued or in flight
+        self.followers = []
+        # Path of the same file, already downloaded for another job
+        self.source = None
+
+        self.state = DownloadJob.QUEUED
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        self.downloaded = 0
+        self.result = None
+        self.done = Event()
+        self.callbacks = []
+        self.callbacks_lock = Lock()
+
+    @property
+    def dc_id(self) -> int:
+        return self.data.dc_id
+
+    @property
+    def location(self) -> tuple:
+        return self.data.location
+
+    @property
+    def file_size(self) -> int:
+        return self.data.file_size or 0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Average download speed since the job started."""
+        if self.started_at is None:
+            return 0.0
+
+        elapsed = time.monotonic() - self.started_at
+
+        return self.downloaded / elapsed if elapsed > 0 else 0.0
+
+    def update(self, current: int, total: int, *args):
+        # Progress callback: keeps track of the bytes downloaded before calling the user's one, if any
+        self.downloaded = current
+
+        if self.progress:
+            self.progress(current, total, *args)
+
+    def add_done_callback(self, callback: callable):
+        """Call *callback(job)* once the job is done, right away in case it is done already."""
+        with self.callbacks_lock:
+            if not self.done.is_set():
+                self.callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def set_done(self):
+        with self.callbacks_lock:
+            self.done.set()
+            callbacks, self.callbacks = self.callbacks, []
+
+        # Callbacks run on the download workers: one failing must not take a worker down
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                log.error(e, exc_info=True)
+
+    def __repr__(self):
+        return "<DownloadJob {} dc={} chat={} {}/{} B>".format(
+            self.state, self.dc_id, self.chat_id, self.downloaded, self.file_size
+        )
+
+
+class DownloadScheduler:
+    """Replacement for the plain FIFO queue feeding the download workers.
+
+    Jobs come in two priority classes: interactive jobs (small files, such as photos, thumbnails and avatars) are always
+    handed out first, and bulk jobs can never take all the workers, so that a new interactive job never waits behind
+    big files. The number of workers is the global limit, bulk jobs are also limited per DC. Within a class, chats take
+    turns, so that a chat with a long backlog doesn't starve the others.
+
+    Keeping a worker free for interactive jobs takes at least two workers: with a single one, bulk jobs have to use it
+    too, and an interactive job queued meanwhile waits for the current bulk download to finish.
+
+    Only one download per remote file is ever queued or in flight: jobs for a file which is already being downloaded
+    into a path wait for that one to finish and are then served from the downloaded file. Finished downloads can be
+    kept around for *cache_time* seconds to serve later requests for the same file the same way.
+    """
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+    def __init__(self, workers: int, max_per_dc: int, cache_time: float = 0):
+        self.workers = workers
+        self.max_per_dc = max_per_dc
+        self.cache_time = cache_time
+
+        # priority -> chat_id -> jobs, chats in turn order
+        self.queues = {
+            DownloadScheduler.INTERACTIVE: OrderedDict(),
+            DownloadScheduler.BULK: OrderedDict()
+        }
+        self.in_flight = []
+        self.files = {}  # location -> job downloading it into a path
+        self.completed = OrderedDict()  # location -> (path, finished_at), oldest first
+        self.stopping = 0
+        self.condition = Condition()
+
+    def put(self, job: DownloadJob):
+        with self.condition:
+            self.enqueue(job)
+
+    def enqueue(self, job: DownloadJob):
+        # Must be called with the condition held
+        leader = self.files.get(job.location)
+
+        if leader is not None:
+            leader.followers.append(job)
+            return
+
+        now = time.monotonic()
+
+        while self.completed and now - next(iter(self.completed.values()))[1] >= self.cache_time:
+            self.completed.popitem(last=False)
+
+        if job.source is None and job.location in self.completed:
+            job.source = self.completed[job.location][0]
+
+        if job.source is not None:
+            # Nothing to download, just a local copy to make
+            job.priority = DownloadScheduler.INTERACTIVE
+        elif job.directory is not None:
+            self.files[job.location] = job
+
+        self.queues[job.priority].setdefault(job.chat_id, deque()).append(job)
+        self.condition.notify()
+
+    def get(self) -> Union[DownloadJob, None]:
+        """Wait for the next job a worker is allowed to start, or None in case the worker has to stop."""
+        with self.condition:
+            while True:
+                job = self.next_job()
+
+                if job is not None:
+                    job.state = DownloadJob.IN_FLIGHT
+                    job.started_at = time.monotonic()
+                    self.in_flight.append(job)
+
+                    return job
+
+                # Stop only once every queued job has been handed out
+                if self.stopping and not self.queued_count():
+                    self.stopping -= 1
+                    return None
+
+                self.condition.wait()
+
+    def task_done(self, job: DownloadJob):
+        with self.condition:
+            job.state = DownloadJob.DONE
+            self.in_flight.remove(job)
+
+            if self.files.get(job.location) is job:
+                del self.files[job.location]
+
+                if job.result and self.cache_time > 0:
+                    self.completed.pop(job.location, None)
+                    self.completed[job.location] = (job.result, time.monotonic())
+
+                # In case of failure, the first follower (if any) takes over the download
+                for follower in job.followers:
+                    follower.source = job.result or None
+                    self.enqueue(follower)
+
+                job.followers = []
+
+            self.condition.notify_all()
+
+        job.set_done()
+
+    def cancel(self, job: DownloadJob) -> bool:
+        """Drop a job which hasn't been handed out yet. Jobs in flight can't be cancelled, False is returned for them."""
+        with self.condition:
+            if job.state != DownloadJob.QUEUED:
+                return False
+
+            chats = self.queues[job.priority]
+            jobs = chats.get(job.chat_id)
+
+            if jobs is not None and job in jobs:
+                jobs.remove(job)
+
+                if not jobs:
+                    del chats[job.chat_id]
+            else:
+                for leader in self.files.values():
+                    if job in leader.followers:
+                        leader.followers.remove(job)
+                        break
+                else:
+                    return False
+
+            if self.files.get(job.location) is job:
+                del self.files[job.location]
+
+                # The first follower (if any) takes over the download
+                for follower in job.followers:
+                    self.enqueue(follower)
+
+                job.followers = []
+
+            job.state = DownloadJob.DONE
+            self.condition.notify_all()
+
+        job.set_done()
+
+        return True
+
+    def stop(self, workers: int):
+        with self.condition:
+            self.stopping += workers
+            self.condition.notify_all()
+
+    def next_job(self) -> Union[DownloadJob, None]:
+        for priority in (DownloadScheduler.INTERACTIVE, DownloadScheduler.BULK):
+            chats = self.queues[priority]
+
+            if priority == DownloadScheduler.BULK:
+                bulk = [j for j in self.in_flight if j.priority == DownloadScheduler.BULK]
+
+                # Keep a worker free for interactive jobs. A single worker can't be kept free: it takes bulk jobs as
+                # well, one at a time, and interactive jobs go first as soon as it's done with the current one
+                if len(bulk) >= max(self.workers - 1, 1):
+                    continue
+
+                busy_dcs = {}
+
+                for j in bulk:
+                    busy_dcs[j.dc_id] = busy_dcs.get(j.dc_id, 0) + 1
+            else:
+                busy_dcs = {}
+
+            for chat_id, jobs in chats.items():
+                for job in jobs:
+                    if priority == DownloadScheduler.BULK and busy_dcs.get(job.dc_id, 0) >= self.max_per_dc:
+                        continue
+
+                    jobs.remove(job)
+
+                    # This chat goes to the back of the line
+                    if jobs:
+                        chats.move_to_end(chat_id)
+                    else:
+                        del chats[chat_id]
+
+                    return job
+
+        return None
+
+    def queued_count(self) -> int:
+        queued = sum(len(jobs) for chats in self.queues.values() for jobs in chats.values())
+
+        return queued + sum(len(job.followers) for job in self.files.values())
+
+    def jobs(self) -> List[DownloadJob]:
+        """Snapshot of the jobs in flight, followed by the queued ones (interactive first)."""
+        with self.condition:
+            queued = [
+                job
+                for priority in (DownloadScheduler.INTERACTIVE, DownloadScheduler.BULK)
+                for jobs in self.queues[priority].values()
+                for job in jobs
+            ]
+
+            following = [follower for job in self.files.values() for follower in job.followers]
+
+            return list(self.in_flight) + queued + following
+
+    def stats(self) -> dict:
+        with self.condition:
+            return dict(
+                queued=self.queued_count(),
+                in_flight=len(self.in_flight),
+                bytes_per_second=sum(job.bytes_per_second for job in self.in_flight)
+            )
@@ -40,3 +40,17 @@ class FileData:
         self.file_name = file_name
         self.date = date
         self.file_ref = file_ref
+
+    @property
+    def location(self) -> tuple:
+        """Identity of the remote file, the same for every file_id (and file_ref) pointing to it."""
+        if self.media_type == 1:
+            return "peer_photo", self.peer_id, self.volume_id, self.local_id, bool(self.is_big)
+
+        if self.media_type in (0, 2):
+            return "photo", self.document_id, self.thumb_size
+
+        if self.media_type == 14:
+            return "document", self.document_id, self.thumb_size
+
+        return "document", self.document_id, ""
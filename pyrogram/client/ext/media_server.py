@@ -0,0 +1,324 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import re
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from threading import Thread, Lock
+from typing import Union
+from urllib.parse import unquote
+
+import pyrogram
+from . import utils
+from .file_data import FileData
+
+log = logging.getLogger(__name__)
+
+
+class MediaFile:
+    """A file served by the media server, along with a way to refresh its file reference."""
+
+    def __init__(self, data: FileData, refresh_file_ref: callable = None):
+        self.data = data
+        self.refresher = refresh_file_ref
+
+    def refresh_file_ref(self) -> str:
+        # Remember the fresh reference, so that the next chunks don't hit the expired one again
+        self.data.file_ref = self.refresher()
+
+        return self.data.file_ref
+
+
+class MediaServer:
+    """Embedded HTTP server streaming media straight from Telegram.
+
+    ``GET /file/<file_id>`` requests, with or without a *Range* header, are mapped onto aligned chunk requests: only
+    the chunks overlapping the requested range are fetched, so that seeking in a big video costs a single chunk. Chunks
+    are kept in a LRU cache shared by every request, and a chunk requested by many viewers at once is only fetched
+    once.
+    """
+
+    RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+    def __init__(self, client, host: str, port: int, cache_size: int, max_files: int):
+        self.client = client
+        self.chunk_size = client.DOWNLOAD_CHUNK_SIZE
+        self.cache_size = cache_size
+        self.max_files = max_files
+
+        self.files = OrderedDict()  # file_id -> MediaFile, least recently used first
+        self.cache = OrderedDict()  # (location, index) -> chunk, least recently used first
+        self.fetching = {}  # (location, index) -> Future
+        self.lock = Lock()
+
+        # Fetches the chunk following the one being sent
+        self.read_ahead = ThreadPoolExecutor(2)
+
+        self.httpd = ThreadingHTTPServer((host, port), MediaRequestHandler)
+        self.httpd.media_server = self
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+
+        return "http://{}:{}".format(host, port)
+
+    def start(self):
+        self.thread = Thread(target=self.httpd.serve_forever, name="MediaServer", daemon=True)
+        self.thread.start()
+
+        log.info("Media server listening on {}".format(self.url))
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.read_ahead.shutdown(wait=False)
+
+        with self.lock:
+            self.cache.clear()
+
+    def url_for(self, message: Union["pyrogram.Message", str], file_ref: str = None) -> str:
+        """Register a media and get the URL it is served at.
+
+        Registered media are served with their size and mime type, which lets players seek. Their file reference is
+        refreshed automatically in case the media comes from a message. Only the *max_files* most recently used media
+        are remembered: older ones are still served, but without their size and mime type.
+        """
+        data = utils.get_file_data(message, file_ref)
+
+        if isinstance(message, pyrogram.Message):
+            media = next(
+                getattr(message, kind)
+                for kind in ("audio", "document", "photo", "sticker", "animation", "video", "voice", "video_note")
+                if getattr(message, kind, None) is not None
+            )
+        else:
+            media = message
+
+        file_id = media if isinstance(media, str) else media.file_id
+
+        self.add_file(file_id, MediaFile(data, utils.get_file_ref_refresher(self.client, message)))
+
+        return "{}/file/{}".format(self.url, file_id)
+
+    def add_file(self, file_id: str, file: MediaFile):
+        with self.lock:
+            self.files[file_id] = file
+            self.files.move_to_end(file_id)
+
+            while len(self.files) > self.max_files:
+                self.files.popitem(last=False)
+
+    def get_file(self, file_id: str) -> MediaFile:
+        with self.lock:
+            file = self.files.get(file_id)
+
+            if file is not None:
+                self.files.move_to_end(file_id)
+                return file
+
+        # Unregistered file ids are served too, but their size is unknown. Decode them once, like registered ones
+        file = MediaFile(utils.get_file_data(file_id))
+        self.add_file(file_id, file)
+
+        return file
+
+    def get_chunk(self, file: MediaFile, index: int) -> bytes:
+        data = file.data
+        key = (data.location, index)
+
+        with self.lock:
+            chunk = self.cache.get(key)
+
+            if chunk is not None:
+                self.cache.move_to_end(key)
+                return chunk
+
+            future = self.fetching.get(key)
+            is_owner = future is None
+
+            if is_owner:
+                future = Future()
+                self.fetching[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            chunk = b"".join(
+                c for _, c in self.client.iter_file(
+                    media_type=data.media_type,
+                    dc_id=data.dc_id,
+                    document_id=data.document_id,
+                    access_hash=data.access_hash,
+                    thumb_size=data.thumb_size,
+                    peer_id=data.peer_id,
+                    peer_type=data.peer_type,
+                    peer_access_hash=data.peer_access_hash,
+                    volume_id=data.volume_id,
+                    local_id=data.local_id,
+                    file_ref=data.file_ref,
+                    file_size=data.file_size or 0,
+                    is_big=data.is_big,
+                    offset=index * self.chunk_size,
+                    limit=self.chunk_size,
+                    refresh_file_ref=file.refresh_file_ref if file.refresher else None
+                )
+            )
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(chunk)
+
+            with self.lock:
+                self.cache[key] = chunk
+
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+            return chunk
+        finally:
+            with self.lock:
+                self.fetching.pop(key, None)
+
+    def prefetch(self, file: MediaFile, index: int):
+        key = (file.data.location, index)
+
+        with self.lock:
+            if key in self.cache or key in self.fetching:
+                return
+
+        def fetch():
+            try:
+                self.get_chunk(file, index)
+            except Exception as e:
+                log.debug("Read-ahead of chunk {} failed: {}".format(index, e))
+
+        try:
+            self.read_ahead.submit(fetch)
+        except RuntimeError:
+            # The server is being stopped
+            pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    server_version = "Pyrogram"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        log.debug("{} - {}".format(self.address_string(), format % args))
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def serve(self, send_body: bool):
+        media_server = self.server.media_server  # type: MediaServer
+        path = unquote(self.path.split("?", 1)[0])
+
+        if not path.startswith("/file/"):
+            self.send_error(404)
+            return
+
+        try:
+            file = media_server.get_file(path[len("/file/"):])
+        except Exception:
+            self.send_error(404, "Invalid file id")
+            return
+
+        size = file.data.file_size or 0
+        start, stop = 0, size  # stop is exclusive, 0 means up to the end in case the size is unknown
+        header = self.headers.get("Range")
+
+        if header and size:
+            match = MediaServer.RANGE_RE.match(header.strip())
+
+            if match is None or match.groups() == ("", ""):
+                self.send_error(416)
+                return
+
+            first, last = match.groups()
+
+            if first:
+                start = int(first)
+                stop = min(int(last) + 1, size) if last else size
+            else:
+                # Suffix range: the last N bytes
+                start = max(size - int(last), 0)
+
+            if start >= stop:
+                self.send_response(416)
+                self.send_header("Content-Range", "bytes */{}".format(size))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, stop - 1, size))
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", file.data.mime_type or "application/octet-stream")
+
+        if size:
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(stop - start))
+        else:
+            # Unknown size: the end of the body is marked by closing the connection
+            self.send_header("Connection", "close")
+            self.close_connection = True
+
+        self.end_headers()
+
+        if not send_body:
+            return
+
+        chunk_size = media_server.chunk_size
+        index = start // chunk_size
+
+        try:
+            while not stop or index * chunk_size < stop:
+                if not stop or (index + 1) * chunk_size < stop:
+                    media_server.prefetch(file, index + 1)
+
+                chunk = media_server.get_chunk(file, index)
+                offset = index * chunk_size
+
+                self.wfile.write(chunk[max(start - offset, 0):(stop - offset) if stop else None])
+
+                if len(chunk) < chunk_size:
+                    break
+
+                index += 1
+        except OSError:
+            # The viewer went away (e.g.: it seeked somewhere else)
+            self.close_connection = True
+        except Exception as e:
+            log.error(e, exc_info=True)
+            self.close_connection = True
@@ -17,6 +17,7 @@
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import base64
+import binascii
 import struct
 from typing import List
 from typing import Union
@@ -24,7 +25,9 @@ from typing import Union
 import pyrogram
 from pyrogram.api.types import PeerUser, PeerChat, PeerChannel
 from . import BaseClient
+from .file_data import FileData
 from ...api import types
+from ...errors import FileIdInvalid
 
 
 def decode_file_id(s: str) -> bytes:
@@ -242,3 +245,171 @@ def get_peer_type(peer_id: int) -> str:
 
 def get_channel_id(peer_id: int) -> int:
     return MAX_CHANNEL_ID - peer_id
+
+
+def get_file_data(message: Union["pyrogram.Message", str], file_ref: str = None) -> FileData:
+    """Extract everything needed to download a media from a message, a media object or a file id string."""
+    error_message = "This message doesn't contain any downloadable media"
+    available_media = ("audio", "document", "photo", "sticker", "animation", "video", "voice", "video_note")
+
+    media_file_name = None
+    file_size = None
+    mime_type = None
+    date = None
+
+    if isinstance(message, pyrogram.Message):
+        for kind in available_media:
+            media = getattr(message, kind, None)
+
+            if media is not None:
+                break
+        else:
+            raise ValueError(error_message)
+    else:
+        media = message
+
+    if isinstance(media, str):
+        file_id_str = media
+    else:
+        file_id_str = media.file_id
+        media_file_name = getattr(media, "file_name", "")
+        file_size = getattr(media, "file_size", None)
+        mime_type = getattr(media, "mime_type", None)
+        date = getattr(media, "date", None)
+        file_ref = getattr(media, "file_ref", None)
+
+    data = FileData(
+        file_name=media_file_name,
+        file_size=file_size,
+        mime_type=mime_type,
+        date=date,
+        file_ref=file_ref
+    )
+
+    def get_existing_attributes() -> dict:
+        return dict(filter(lambda x: x[1] is not None, data.__dict__.items()))
+
+    try:
+        decoded = decode_file_id(file_id_str)
+        media_type = decoded[0]
+
+        if media_type == 1:
+            unpacked = struct.unpack("<iiqqqiiiqi", decoded)
+            dc_id, photo_id, _, volume_id, size_type, peer_id, x, peer_access_hash, local_id = unpacked[1:]
+
+            if x == 0:
+                peer_type = "user"
+            elif x == -1:
+                peer_id = -peer_id
+                peer_type = "chat"
+            else:
+                peer_id = get_channel_id(peer_id - 1000727379968)
+                peer_type = "channel"
+
+            data = FileData(
+                **get_existing_attributes(),
+                media_type=media_type,
+                dc_id=dc_id,
+                peer_id=peer_id,
+                peer_type=peer_type,
+                peer_access_hash=peer_access_hash,
+                volume_id=volume_id,
+                local_id=local_id,
+                is_big=size_type == 3
+            )
+        elif media_type in (0, 2, 14):
+            unpacked = struct.unpack("<iiqqqiiii", decoded)
+            dc_id, document_id, access_hash, volume_id, _, _, thumb_size, local_id = unpacked[1:]
+
+            data = FileData(
+                **get_existing_attributes(),
+                media_type=media_type,
+                dc_id=dc_id,
+                document_id=document_id,
+                access_hash=access_hash,
+                thumb_size=chr(thumb_size)
+            )
+        elif media_type in (3, 4, 5, 8, 9, 10, 13):
+            unpacked = struct.unpack("<iiqq", decoded)
+            dc_id, document_id, access_hash = unpacked[1:]
+
+            data = FileData(
+                **get_existing_attributes(),
+                media_type=media_type,
+                dc_id=dc_id,
+                document_id=document_id,
+                access_hash=access_hash
+            )
+        else:
+            raise ValueError("Unknown media type: {}".format(file_id_str))
+    except (AssertionError, binascii.Error, struct.error):
+        raise FileIdInvalid from None
+
+    return data
+
+
+def get_input_file_location(
+    media_type: int, document_id: int, access_hash: int, thumb_size: str, peer_id: int, peer_type: str,
+    peer_access_hash: int, volume_id: int, local_id: int, is_big: bool, file_ref: str
+) -> Union[types.InputPeerPhotoFileLocation, types.InputPhotoFileLocation, types.InputDocumentFileLocation]:
+    file_ref = decode_file_ref(file_ref)
+
+    if media_type == 1:
+        if peer_type == "user":
+            peer = types.InputPeerUser(
+                user_id=peer_id,
+                access_hash=peer_access_hash
+            )
+        elif peer_type == "chat":
+            peer = types.InputPeerChat(
+                chat_id=peer_id
+            )
+        else:
+            peer = types.InputPeerChannel(
+                channel_id=peer_id,
+                access_hash=peer_access_hash
+            )
+
+        location = types.InputPeerPhotoFileLocation(
+            peer=peer,
+            volume_id=volume_id,
+            local_id=local_id,
+            big=is_big or None
+        )
+    elif media_type in (0, 2):
+        location = types.InputPhotoFileLocation(
+            id=document_id,
+            access_hash=access_hash,
+            file_reference=file_ref,
+            thumb_size=thumb_size
+        )
+    elif media_type == 14:
+        location = types.InputDocumentFileLocation(
+            id=document_id,
+            access_hash=access_hash,
+            file_reference=file_ref,
+            thumb_size=thumb_size
+        )
+    else:
+        location = types.InputDocumentFileLocation(
+            id=document_id,
+            access_hash=access_hash,
+            file_reference=file_ref,
+            thumb_size=""
+        )
+
+    return location
+
+
+def get_file_ref_refresher(client, message: Union["pyrogram.Message", str]) -> Union[callable, None]:
+    """Get a function that fetches the message again and returns a fresh file reference for its media.
+
+    Only messages can be fetched again: None is returned for media objects and file ids.
+    """
+    if not isinstance(message, pyrogram.Message) or message.chat is None:
+        return None
+
+    def refresh() -> str:
+        return get_file_data(client.get_messages(message.chat.id, message.message_id)).file_ref
+
+    return refresh
@@ -17,6 +17,7 @@
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .delete_messages import DeleteMessages
+from .download_many import DownloadMany
 from .download_media import DownloadMedia
 from .edit_inline_caption import EditInlineCaption
 from .edit_inline_media import EditInlineMedia
@@ -50,6 +51,8 @@ from .send_video import SendVideo
 from .send_video_note import SendVideoNote
 from .send_voice import SendVoice
 from .stop_poll import StopPoll
+from .stream_media import StreamMedia
+from .upload_many import UploadMany
 from .vote_poll import VotePoll
 
 
@@ -81,6 +84,9 @@ class Messages(
     StopPoll,
     RetractVote,
     DownloadMedia,
+    StreamMedia,
+    DownloadMany,
+    UploadMany,
     IterHistory,
     SendCachedMedia,
     GetHistoryCount,
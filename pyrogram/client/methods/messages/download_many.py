@@ -0,0 +1,220 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import os
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Union, Iterable
+
+import pyrogram
+from pyrogram.api import functions, types
+from pyrogram.client.ext import BaseClient, BulkTransfer, Journal, DownloadScheduler, DownloadJob, utils
+from pyrogram.errors import FileIdInvalid
+from .download_media import DEFAULT_DOWNLOAD_DIR, create_download_job
+
+log = logging.getLogger(__name__)
+
+
+class DownloadMany(BaseClient):
+    def download_many(
+        self,
+        messages: Iterable[Union["pyrogram.Message", str]],
+        directory: str = DEFAULT_DOWNLOAD_DIR,
+        journal: str = None
+    ) -> BulkTransfer:
+        """Download the media of many messages at once.
+
+        Meant for batches of thousands of files, such as archiving a whole chat. Small files (thumbnails, photos,
+        stickers, ...) are fetched with a single request each, many of them in flight at once on the media session of
+        their DC, instead of one at a time by each download worker. Bigger files are handed to the download workers as
+        bulk downloads. The messages are consumed lazily and only a bounded number of them is in flight at any time,
+        so *messages* can be a generator over a whole chat history.
+
+        Parameters:
+            messages (Iterable of :obj:`Message` | ``str``):
+                The messages containing the media, the media themselves (message.audio, message.video, ...) or the
+                file ids as strings.
+
+            directory (``str``, *optional*):
+                The directory the files are downloaded into, with the names provided by Telegram.
+                Defaults to the *downloads* folder in your working directory.
+
+            journal (``str``, *optional*):
+                Path of a file keeping track of the files downloaded so far. Running the same batch again with the same
+                journal skips the files already downloaded (as long as they are still on disk), so that an
+                interrupted batch resumes where it stopped.
+
+        Returns:
+            ``BulkTransfer``: An iterable of *(message, path)* tuples, in the order the downloads complete. The path
+            is None in case the download failed.
+
+        Example:
+            .. code-block:: python
+
+                transfer = app.download_many(app.iter_history("pyrogramchat"), journal="archive.journal")
+
+                for message, path in transfer:
+                    print(message.message_id, path)
+
+                print(transfer.stats())
+        """
+        small_size = self.DOWNLOAD_MANY_SMALL_SIZE
+
+        def fetch(job: DownloadJob) -> Future:
+            data = job.data
+
+            future = self.get_media_session(data.dc_id).send_async(
+                functions.upload.GetFile(
+                    location=utils.get_input_file_location(
+                        data.media_type, data.document_id, data.access_hash, data.thumb_size, data.peer_id,
+                        data.peer_type, data.peer_access_hash, data.volume_id, data.local_id, data.is_big,
+                        data.file_ref
+                    ),
+                    offset=0,
+                    limit=small_size
+                )
+            )
+
+            self.telemetry.track(future, data.dc_id)
+
+            return future
+
+        def queue(job: DownloadJob) -> Future:
+            future = Future()
+
+            def done(job: DownloadJob):
+                # The batch may have been abandoned in the meantime
+                if future.set_running_or_notify_cancel():
+                    future.set_result(job.result)
+
+            job.add_done_callback(done)
+            self.download_scheduler.put(job)
+
+            return future
+
+        def save(job: DownloadJob, chunk: bytes) -> str:
+            path = os.path.abspath(os.path.join(job.directory, job.file_name))
+            os.makedirs(job.directory, exist_ok=True)
+
+            with open(path + ".temp", "wb") as f:
+                f.write(chunk)
+
+            os.replace(path + ".temp", path)
+
+            return path
+
+        def run(transfer: BulkTransfer):
+            entries = Journal(journal) if journal else None
+            items = iter(messages)
+            pending = {}  # future -> (message, job, is_single_request)
+
+            try:
+                while True:
+                    while items is not None and len(pending) < self.DOWNLOAD_MANY_WINDOW:
+                        try:
+                            message = next(items)
+                        except StopIteration:
+                            items = None
+                            break
+
+                        try:
+                            job = create_download_job(
+                                self, message, file_name=os.path.join(directory, ""), priority=DownloadScheduler.BULK
+                            )
+                        except (ValueError, FileIdInvalid) as e:
+                            log.warning(e)
+                            transfer.failed += 1
+                            yield message, None
+                            continue
+
+                        if entries is not None:
+                            path = entries.get(json.dumps(job.location))
+
+                            if path is not None and os.path.isfile(path):
+                                transfer.skipped += 1
+                                continue
+
+                        # Files that fit in a single request skip the download workers entirely
+                        if job.file_size <= small_size:
+                            pending[fetch(job)] = (message, job, True)
+                        else:
+                            pending[queue(job)] = (message, job, False)
+
+                    transfer.in_flight = len(pending)
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        message, job, is_single_request = pending.pop(future)
+                        path = None
+
+                        if is_single_request:
+                            try:
+                                r = future.result()
+                            except Exception as e:
+                                log.debug("Single request download failed: {}".format(e))
+                                r = None
+
+                            # A full chunk of a file of unknown size may not be the whole file
+                            if isinstance(r, types.upload.File) and (
+                                len(r.bytes) < small_size or job.file_size == len(r.bytes)
+                            ):
+                                # Paid for once arrived, which holds back the requests that follow
+                                self.throttle(len(r.bytes))
+
+                                try:
+                                    path = save(job, r.bytes)
+                                except OSError as e:
+                                    log.error(e, exc_info=True)
+                                else:
+                                    job.downloaded = len(r.bytes)
+                            else:
+                                # Let a download worker take care of it (CDN redirects, expired references, ...)
+                                pending[queue(job)] = (message, job, False)
+                                continue
+                        else:
+                            path = future.result()
+
+                        transfer.in_flight = len(pending)
+
+                        if path:
+                            transfer.completed += 1
+                            transfer.bytes += job.downloaded
+
+                            if entries is not None:
+                                entries.add(json.dumps(job.location), path)
+                        else:
+                            transfer.failed += 1
+
+                        yield message, path
+            finally:
+                for future, (_, job, is_single_request) in pending.items():
+                    future.cancel()
+
+                    # Files not handed to a download worker yet are dropped, the ones in flight run to completion
+                    if not is_single_request:
+                        self.download_scheduler.cancel(job)
+
+                if entries is not None:
+                    entries.close()
+
+        return BulkTransfer(run)
@@ -16,17 +16,13 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-import binascii
 import os
-import struct
 import time
 from datetime import datetime
-from threading import Event
-from typing import Union
+from typing import Union, BinaryIO
 
 import pyrogram
-from pyrogram.client.ext import BaseClient, FileData, utils
-from pyrogram.errors import FileIdInvalid
+from pyrogram.client.ext import BaseClient, DownloadScheduler, DownloadJob, utils
 
 DEFAULT_DOWNLOAD_DIR = "downloads/"
 
@@ -36,11 +32,13 @@ class DownloadMedia(BaseClient):
         self,
         message: Union["pyrogram.Message", str],
         file_ref: str = None,
-        file_name: str = DEFAULT_DOWNLOAD_DIR,
+        file_name: Union[str, BinaryIO] = DEFAULT_DOWNLOAD_DIR,
         block: bool = True,
         progress: callable = None,
-        progress_args: tuple = ()
-    ) -> Union[str, None]:
+        progress_args: tuple = (),
+        priority: str = None,
+        bandwidth_limit: int = None
+    ) -> Union[str, BinaryIO, None]:
         """Download the media from a message.
 
         Parameters:
@@ -52,11 +50,17 @@ class DownloadMedia(BaseClient):
                 A valid file reference obtained by a recently fetched media message.
                 To be used in combination with a file id in case a file reference is needed.
 
-            file_name (``str``, *optional*):
+            file_name (``str`` | ``BinaryIO``, *optional*):
                 A custom *file_name* to be used instead of the one provided by Telegram.
                 By default, all files are downloaded in the *downloads* folder in your working directory.
                 You can also specify a path for downloading files in a custom location: paths that end with "/"
                 are considered directories. All non-existent folders will be created automatically.
+                The file is first written next to its destination with a *.temp* extension: in case the download
+                fails midway, downloading the same media to the same destination again resumes it.
+                You can also pass a binary file-like object (an open file, a pipe, an :obj:`io.BytesIO`, ...): the
+                file content is then written into it sequentially, without touching the disk.
+                Concurrent downloads of the same file are merged into a single transfer: when no file name is given,
+                every caller gets the path of that one file, otherwise the file is copied to each destination.
 
             block (``bool``, *optional*):
                 Blocks the code execution until the file has been downloaded.
@@ -73,6 +77,14 @@ class DownloadMedia(BaseClient):
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            priority (``str``, *optional*):
+                Either "interactive" or "bulk". Interactive downloads are served first and never wait behind bulk ones.
+                By default, files up to 1 MiB (and files of unknown size, such as chat photos) are interactive.
+
+            bandwidth_limit (``int``, *optional*):
+                Maximum download speed of this file, in bytes per second, on top of the limits set with
+                :meth:`~Client.set_bandwidth_limit`.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -85,8 +97,9 @@ class DownloadMedia(BaseClient):
                 You can either keep *\*args* or add every single extra argument in your function signature.
 
         Returns:
-            ``str`` | ``None``: On success, the absolute path of the downloaded file is returned, otherwise, in case
-            the download failed or was deliberately stopped with :meth:`~Client.stop_transmission`, None is returned.
+            ``str`` | ``BinaryIO`` | ``None``: On success, the absolute path of the downloaded file is returned (or the
+            file-like object itself, in case one was passed as *file_name*), otherwise, in case the download failed or
+            was deliberately stopped with :meth:`~Client.stop_transmission`, None is returned.
 
         Raises:
             ValueError: if the message doesn't contain any downloadable media
@@ -99,143 +112,94 @@ class DownloadMedia(BaseClient):
 
                 # Download from file id
                 app.download_media("CAADBAADyg4AAvLQYAEYD4F7vcZ43AI")
+
+                # Download into memory
+                from io import BytesIO
+                app.download_media(message, file_name=BytesIO())
         """
-        error_message = "This message doesn't contain any downloadable media"
-        available_media = ("audio", "document", "photo", "sticker", "animation", "video", "voice", "video_note")
-
-        media_file_name = None
-        file_size = None
-        mime_type = None
-        date = None
-
-        if isinstance(message, pyrogram.Message):
-            for kind in available_media:
-                media = getattr(message, kind, None)
-
-                if media is not None:
-                    break
-            else:
-                raise ValueError(error_message)
-        else:
-            media = message
+        job = create_download_job(
+            self, message, file_ref, file_name, progress, progress_args, priority, bandwidth_limit
+        )
 
-        if isinstance(media, str):
-            file_id_str = media
+        self.download_scheduler.put(job)
+
+        if block:
+            job.done.wait()
+
+        return job.result
+
+
+def create_download_job(
+    client: BaseClient,
+    message: Union["pyrogram.Message", str],
+    file_ref: str = None,
+    file_name: Union[str, BinaryIO] = DEFAULT_DOWNLOAD_DIR,
+    progress: callable = None,
+    progress_args: tuple = (),
+    priority: str = None,
+    bandwidth_limit: int = None
+) -> DownloadJob:
+    """Resolve the destination of a media download and describe it as a job for the download workers."""
+    data = utils.get_file_data(message, file_ref)
+
+    if priority is None:
+        if not data.file_size or data.file_size <= client.DOWNLOAD_INTERACTIVE_SIZE:
+            priority = DownloadScheduler.INTERACTIVE
         else:
-            file_id_str = media.file_id
-            media_file_name = getattr(media, "file_name", "")
-            file_size = getattr(media, "file_size", None)
-            mime_type = getattr(media, "mime_type", None)
-            date = getattr(media, "date", None)
-            file_ref = getattr(media, "file_ref", None)
-
-        data = FileData(
-            file_name=media_file_name,
-            file_size=file_size,
-            mime_type=mime_type,
-            date=date,
-            file_ref=file_ref
+            priority = DownloadScheduler.BULK
+    elif priority not in (DownloadScheduler.INTERACTIVE, DownloadScheduler.BULK):
+        raise ValueError('Invalid priority "{}"'.format(priority))
+
+    def job(directory, file_name, named=True):
+        return DownloadJob(
+            data=data,
+            directory=directory,
+            file_name=file_name,
+            progress=progress,
+            progress_args=progress_args,
+            refresh_file_ref=utils.get_file_ref_refresher(client, message),
+            priority=priority,
+            chat_id=message.chat.id if isinstance(message, pyrogram.Message) and message.chat else None,
+            named=named,
+            bandwidth_limit=bandwidth_limit
         )
 
-        def get_existing_attributes() -> dict:
-            return dict(filter(lambda x: x[1] is not None, data.__dict__.items()))
-
-        try:
-            decoded = utils.decode_file_id(file_id_str)
-            media_type = decoded[0]
-
-            if media_type == 1:
-                unpacked = struct.unpack("<iiqqqiiiqi", decoded)
-                dc_id, photo_id, _, volume_id, size_type, peer_id, x, peer_access_hash, local_id = unpacked[1:]
-
-                if x == 0:
-                    peer_type = "user"
-                elif x == -1:
-                    peer_id = -peer_id
-                    peer_type = "chat"
-                else:
-                    peer_id = utils.get_channel_id(peer_id - 1000727379968)
-                    peer_type = "channel"
-
-                data = FileData(
-                    **get_existing_attributes(),
-                    media_type=media_type,
-                    dc_id=dc_id,
-                    peer_id=peer_id,
-                    peer_type=peer_type,
-                    peer_access_hash=peer_access_hash,
-                    volume_id=volume_id,
-                    local_id=local_id,
-                    is_big=size_type == 3
-                )
-            elif media_type in (0, 2, 14):
-                unpacked = struct.unpack("<iiqqqiiii", decoded)
-                dc_id, document_id, access_hash, volume_id, _, _, thumb_size, local_id = unpacked[1:]
-
-                data = FileData(
-                    **get_existing_attributes(),
-                    media_type=media_type,
-                    dc_id=dc_id,
-                    document_id=document_id,
-                    access_hash=access_hash,
-                    thumb_size=chr(thumb_size)
-                )
-            elif media_type in (3, 4, 5, 8, 9, 10, 13):
-                unpacked = struct.unpack("<iiqq", decoded)
-                dc_id, document_id, access_hash = unpacked[1:]
-
-                data = FileData(
-                    **get_existing_attributes(),
-                    media_type=media_type,
-                    dc_id=dc_id,
-                    document_id=document_id,
-                    access_hash=access_hash
-                )
-            else:
-                raise ValueError("Unknown media type: {}".format(file_id_str))
-        except (AssertionError, binascii.Error, struct.error):
-            raise FileIdInvalid from None
-
-        done = Event()
-        path = [None]
-
-        directory, file_name = os.path.split(file_name)
-        file_name = file_name or data.file_name or ""
-
-        if not os.path.isabs(file_name):
-            directory = self.PARENT_DIR / (directory or DEFAULT_DOWNLOAD_DIR)
-
-        media_type_str = self.MEDIA_TYPE_ID[data.media_type]
-
-        if not file_name:
-            guessed_extension = self.guess_extension(data.mime_type)
-
-            if data.media_type in (0, 1, 2, 14):
-                extension = ".jpg"
-            elif data.media_type == 3:
-                extension = guessed_extension or ".ogg"
-            elif data.media_type in (4, 10, 13):
-                extension = guessed_extension or ".mp4"
-            elif data.media_type == 5:
-                extension = guessed_extension or ".zip"
-            elif data.media_type == 8:
-                extension = guessed_extension or ".webp"
-            elif data.media_type == 9:
-                extension = guessed_extension or ".mp3"
-            else:
-                extension = ".unknown"
-
-            file_name = "{}_{}_{}{}".format(
-                media_type_str,
-                datetime.fromtimestamp(data.date or time.time()).strftime("%Y-%m-%d_%H-%M-%S"),
-                self.rnd_id(),
-                extension
-            )
-
-        # Cast to string because Path objects aren't supported by Python 3.5
-        self.download_queue.put((data, str(directory), str(file_name), done, progress, progress_args, path))
+    if hasattr(file_name, "write"):
+        return job(None, file_name)
+
+    directory, file_name = os.path.split(file_name)
+    named = bool(file_name)
+    file_name = file_name or data.file_name or ""
+
+    if not os.path.isabs(file_name):
+        directory = client.PARENT_DIR / (directory or DEFAULT_DOWNLOAD_DIR)
+
+    media_type_str = client.MEDIA_TYPE_ID[data.media_type]
+
+    if not file_name:
+        guessed_extension = client.guess_extension(data.mime_type)
+
+        if data.media_type in (0, 1, 2, 14):
+            extension = ".jpg"
+        elif data.media_type == 3:
+            extension = guessed_extension or ".ogg"
+        elif data.media_type in (4, 10, 13):
+            extension = guessed_extension or ".mp4"
+        elif data.media_type == 5:
+            extension = guessed_extension or ".zip"
+        elif data.media_type == 8:
+            extension = guessed_extension or ".webp"
+        elif data.media_type == 9:
+            extension = guessed_extension or ".mp3"
+        else:
+            extension = ".unknown"
 
-        if block:
-            done.wait()
+        file_name = "{}_{}_{}{}".format(
+            media_type_str,
+            datetime.fromtimestamp(data.date or time.time()).strftime("%Y-%m-%d_%H-%M-%S"),
+            client.rnd_id(),
+            extension
+        )
 
-        return path[0]
+    # Cast to string because Path objects aren't supported by Python 3.5
+    return job(str(directory), str(file_name), named)
@@ -156,26 +156,12 @@ class SendAnimation(BaseClient):
                 app.send_animation("me", "animation.gif", progress=progress)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(animation):
-                thumb = None if thumb is None else self.save_file(thumb)
-                file = self.save_file(animation, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(animation) or "video/mp4",
-                    file=file,
-                    thumb=thumb,
-                    attributes=[
-                        types.DocumentAttributeVideo(
-                            supports_streaming=True,
-                            duration=duration,
-                            w=width,
-                            h=height
-                        ),
-                        types.DocumentAttributeFilename(file_name=os.path.basename(animation)),
-                        types.DocumentAttributeAnimated()
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(animation, self.guess_mime_type(animation) or "video/mp4", 10)
+                media = self.get_cached_upload(cache_key)
             elif animation.startswith("http"):
                 media = types.InputMediaDocumentExternal(
                     url=animation
@@ -184,6 +170,25 @@ class SendAnimation(BaseClient):
                 media = utils.get_input_media_from_file_id(animation, file_ref, 10)
 
             while True:
+                if media is None:
+                    thumb = None if thumb is None else self.save_file(thumb)
+                    file = self.save_file(animation, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(animation) or "video/mp4",
+                        file=file,
+                        thumb=thumb,
+                        attributes=[
+                            types.DocumentAttributeVideo(
+                                supports_streaming=True,
+                                duration=duration,
+                                w=width,
+                                h=height
+                            ),
+                            types.DocumentAttributeFilename(file_name=os.path.basename(animation)),
+                            types.DocumentAttributeAnimated()
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -199,6 +204,13 @@ class SendAnimation(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(animation, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
@@ -212,6 +224,8 @@ class SendAnimation(BaseClient):
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
 
+                            self.update_cached_upload(cache_key, message)
+
                             if unsave:
                                 document = message.animation or message.document
                                 document_id = utils.get_input_media_from_file_id(document.file_id, document.file_ref).id
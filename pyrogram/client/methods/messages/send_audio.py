@@ -156,24 +156,12 @@ class SendAudio(BaseClient):
                 app.send_audio("me", "audio.mp3", progress=progress)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(audio):
-                thumb = None if thumb is None else self.save_file(thumb)
-                file = self.save_file(audio, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(audio) or "audio/mpeg",
-                    file=file,
-                    thumb=thumb,
-                    attributes=[
-                        types.DocumentAttributeAudio(
-                            duration=duration,
-                            performer=performer,
-                            title=title
-                        ),
-                        types.DocumentAttributeFilename(file_name=os.path.basename(audio))
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(audio, self.guess_mime_type(audio) or "audio/mpeg", 9)
+                media = self.get_cached_upload(cache_key)
             elif audio.startswith("http"):
                 media = types.InputMediaDocumentExternal(
                     url=audio
@@ -182,6 +170,23 @@ class SendAudio(BaseClient):
                 media = utils.get_input_media_from_file_id(audio, file_ref, 9)
 
             while True:
+                if media is None:
+                    thumb = None if thumb is None else self.save_file(thumb)
+                    file = self.save_file(audio, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(audio) or "audio/mpeg",
+                        file=file,
+                        thumb=thumb,
+                        attributes=[
+                            types.DocumentAttributeAudio(
+                                duration=duration,
+                                performer=performer,
+                                title=title
+                            ),
+                            types.DocumentAttributeFilename(file_name=os.path.basename(audio))
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -197,17 +202,28 @@ class SendAudio(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(audio, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
@@ -136,19 +136,12 @@ class SendDocument(BaseClient):
                 app.send_document("me", "document.zip", progress=progress)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(document):
-                thumb = None if thumb is None else self.save_file(thumb)
-                file = self.save_file(document, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(document) or "application/zip",
-                    file=file,
-                    thumb=thumb,
-                    attributes=[
-                        types.DocumentAttributeFilename(file_name=os.path.basename(document))
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(document, self.guess_mime_type(document) or "application/zip", 5)
+                media = self.get_cached_upload(cache_key)
             elif document.startswith("http"):
                 media = types.InputMediaDocumentExternal(
                     url=document
@@ -157,6 +150,18 @@ class SendDocument(BaseClient):
                 media = utils.get_input_media_from_file_id(document, file_ref, 5)
 
             while True:
+                if media is None:
+                    thumb = None if thumb is None else self.save_file(thumb)
+                    file = self.save_file(document, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(document) or "application/zip",
+                        file=file,
+                        thumb=thumb,
+                        attributes=[
+                            types.DocumentAttributeFilename(file_name=os.path.basename(document))
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -172,17 +177,28 @@ class SendDocument(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(document, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
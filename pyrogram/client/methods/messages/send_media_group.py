@@ -19,6 +19,7 @@
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union, List
 
 import pyrogram
@@ -48,6 +49,7 @@ class SendMediaGroup(BaseClient):
 
             media (List of :obj:`InputMediaPhoto` and :obj:`InputMediaVideo`):
                 A list describing photos and videos to be sent, must include 2–10 items.
+                Local files are uploaded in parallel; the album keeps the order of this list.
 
             disable_notification (``bool``, *optional*):
                 Sends the message silently.
@@ -73,122 +75,107 @@ class SendMediaGroup(BaseClient):
                     ]
                 )
         """
-        multi_media = []
+        peer = self.resolve_peer(chat_id)
 
-        for i in media:
+        def upload(media):
+            while True:
+                try:
+                    return self.send(
+                        functions.messages.UploadMedia(
+                            peer=peer,
+                            media=media
+                        )
+                    )
+                except FloodWait as e:
+                    # Only this item waits, the others keep uploading
+                    log.warning("Sleeping for {}s".format(e.x))
+                    time.sleep(e.x)
+
+        def get_media(i):
             if isinstance(i, pyrogram.InputMediaPhoto):
                 if os.path.exists(i.media):
-                    while True:
-                        try:
-                            media = self.send(
-                                functions.messages.UploadMedia(
-                                    peer=self.resolve_peer(chat_id),
-                                    media=types.InputMediaUploadedPhoto(
-                                        file=self.save_file(i.media)
-                                    )
-                                )
-                            )
-                        except FloodWait as e:
-                            log.warning("Sleeping for {}s".format(e.x))
-                            time.sleep(e.x)
-                        else:
-                            break
-
-                    media = types.InputMediaPhoto(
-                        id=types.InputPhoto(
-                            id=media.photo.id,
-                            access_hash=media.photo.access_hash,
-                            file_reference=media.photo.file_reference
+                    media = upload(
+                        types.InputMediaUploadedPhoto(
+                            file=self.save_file(i.media)
                         )
                     )
                 elif i.media.startswith("http"):
-                    media = self.send(
-                        functions.messages.UploadMedia(
-                            peer=self.resolve_peer(chat_id),
-                            media=types.InputMediaPhotoExternal(
-                                url=i.media
-                            )
+                    media = upload(
+                        types.InputMediaPhotoExternal(
+                            url=i.media
                         )
                     )
+                else:
+                    return utils.get_input_media_from_file_id(i.media, i.file_ref, 2)
 
-                    media = types.InputMediaPhoto(
-                        id=types.InputPhoto(
-                            id=media.photo.id,
-                            access_hash=media.photo.access_hash,
-                            file_reference=media.photo.file_reference
-                        )
+                return types.InputMediaPhoto(
+                    id=types.InputPhoto(
+                        id=media.photo.id,
+                        access_hash=media.photo.access_hash,
+                        file_reference=media.photo.file_reference
                     )
-                else:
-                    media = utils.get_input_media_from_file_id(i.media, i.file_ref, 2)
+                )
             elif isinstance(i, pyrogram.InputMediaVideo):
                 if os.path.exists(i.media):
-                    while True:
-                        try:
-                            media = self.send(
-                                functions.messages.UploadMedia(
-                                    peer=self.resolve_peer(chat_id),
-                                    media=types.InputMediaUploadedDocument(
-                                        file=self.save_file(i.media),
-                                        thumb=None if i.thumb is None else self.save_file(i.thumb),
-                                        mime_type=self.guess_mime_type(i.media) or "video/mp4",
-                                        attributes=[
-                                            types.DocumentAttributeVideo(
-                                                supports_streaming=i.supports_streaming or None,
-                                                duration=i.duration,
-                                                w=i.width,
-                                                h=i.height
-                                            ),
-                                            types.DocumentAttributeFilename(file_name=os.path.basename(i.media))
-                                        ]
-                                    )
-                                )
-                            )
-                        except FloodWait as e:
-                            log.warning("Sleeping for {}s".format(e.x))
-                            time.sleep(e.x)
-                        else:
-                            break
-
-                    media = types.InputMediaDocument(
-                        id=types.InputDocument(
-                            id=media.document.id,
-                            access_hash=media.document.access_hash,
-                            file_reference=media.document.file_reference
+                    media = upload(
+                        types.InputMediaUploadedDocument(
+                            file=self.save_file(i.media),
+                            thumb=None if i.thumb is None else self.save_file(i.thumb),
+                            mime_type=self.guess_mime_type(i.media) or "video/mp4",
+                            attributes=[
+                                types.DocumentAttributeVideo(
+                                    supports_streaming=i.supports_streaming or None,
+                                    duration=i.duration,
+                                    w=i.width,
+                                    h=i.height
+                                ),
+                                types.DocumentAttributeFilename(file_name=os.path.basename(i.media))
+                            ]
                         )
                     )
                 elif i.media.startswith("http"):
-                    media = self.send(
-                        functions.messages.UploadMedia(
-                            peer=self.resolve_peer(chat_id),
-                            media=types.InputMediaDocumentExternal(
-                                url=i.media
-                            )
-                        )
-                    )
-
-                    media = types.InputMediaDocument(
-                        id=types.InputDocument(
-                            id=media.document.id,
-                            access_hash=media.document.access_hash,
-                            file_reference=media.document.file_reference
+                    media = upload(
+                        types.InputMediaDocumentExternal(
+                            url=i.media
                         )
                     )
                 else:
-                    media = utils.get_input_media_from_file_id(i.media, i.file_ref, 4)
+                    return utils.get_input_media_from_file_id(i.media, i.file_ref, 4)
 
-            multi_media.append(
-                types.InputSingleMedia(
-                    media=media,
-                    random_id=self.rnd_id(),
-                    **self.parser.parse(i.caption, i.parse_mode)
+                return types.InputMediaDocument(
+                    id=types.InputDocument(
+                        id=media.document.id,
+                        access_hash=media.document.access_hash,
+                        file_reference=media.document.file_reference
+                    )
                 )
+
+        # Items are uploaded in parallel, each one along with its own thumbnail, and collected back in input order
+        with ThreadPoolExecutor(max(min(len(media), self.MEDIA_GROUP_WORKERS), 1)) as executor:
+            futures = [executor.submit(get_media, i) for i in media]
+
+            try:
+                uploaded = [f.result() for f in futures]
+            except Exception:
+                for f in futures:
+                    f.cancel()
+
+                raise
+
+        multi_media = [
+            types.InputSingleMedia(
+                media=m,
+                random_id=self.rnd_id(),
+                **self.parser.parse(i.caption, i.parse_mode)
             )
+            for i, m in zip(media, uploaded)
+        ]
 
         while True:
             try:
                 r = self.send(
                     functions.messages.SendMultiMedia(
-                        peer=self.resolve_peer(chat_id),
+                        peer=peer,
                         multi_media=multi_media,
                         silent=disable_notification or None,
                         reply_to_msg_id=reply_to_message_id
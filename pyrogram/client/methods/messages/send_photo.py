@@ -135,14 +135,15 @@ class SendPhoto(BaseClient):
                 app.send_photo("me", "photo.jpg", ttl_seconds=10)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(photo):
-                file = self.save_file(photo, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedPhoto(
-                    file=file,
-                    ttl_seconds=ttl_seconds
-                )
+                cache_key = self.get_upload_cache_key(photo, self.guess_mime_type(photo), 2)
+                media = self.get_cached_upload(cache_key)
+
+                if media is not None:
+                    media.ttl_seconds = ttl_seconds
             elif photo.startswith("http"):
                 media = types.InputMediaPhotoExternal(
                     url=photo,
@@ -152,6 +153,13 @@ class SendPhoto(BaseClient):
                 media = utils.get_input_media_from_file_id(photo, file_ref, 2)
 
             while True:
+                if media is None:
+                    file = self.save_file(photo, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedPhoto(
+                        file=file,
+                        ttl_seconds=ttl_seconds
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -167,17 +175,28 @@ class SendPhoto(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(photo, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
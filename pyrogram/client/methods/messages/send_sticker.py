@@ -111,17 +111,12 @@ class SendSticker(BaseClient):
                 app.send_sticker("me", "CAADBAADyg4AAvLQYAEYD4F7vcZ43AI")
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(sticker):
-                file = self.save_file(sticker, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(sticker) or "image/webp",
-                    file=file,
-                    attributes=[
-                        types.DocumentAttributeFilename(file_name=os.path.basename(sticker))
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(sticker, self.guess_mime_type(sticker) or "image/webp", 8)
+                media = self.get_cached_upload(cache_key)
             elif sticker.startswith("http"):
                 media = types.InputMediaDocumentExternal(
                     url=sticker
@@ -130,6 +125,16 @@ class SendSticker(BaseClient):
                 media = utils.get_input_media_from_file_id(sticker, file_ref, 8)
 
             while True:
+                if media is None:
+                    file = self.save_file(sticker, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(sticker) or "image/webp",
+                        file=file,
+                        attributes=[
+                            types.DocumentAttributeFilename(file_name=os.path.basename(sticker))
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -145,17 +150,28 @@ class SendSticker(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(sticker, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
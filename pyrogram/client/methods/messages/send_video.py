@@ -153,25 +153,12 @@ class SendVideo(BaseClient):
                 app.send_video("me", "video.mp4", progress=progress)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(video):
-                thumb = None if thumb is None else self.save_file(thumb)
-                file = self.save_file(video, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(video) or "video/mp4",
-                    file=file,
-                    thumb=thumb,
-                    attributes=[
-                        types.DocumentAttributeVideo(
-                            supports_streaming=supports_streaming or None,
-                            duration=duration,
-                            w=width,
-                            h=height
-                        ),
-                        types.DocumentAttributeFilename(file_name=os.path.basename(video))
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(video, self.guess_mime_type(video) or "video/mp4", 4)
+                media = self.get_cached_upload(cache_key)
             elif video.startswith("http"):
                 media = types.InputMediaDocumentExternal(
                     url=video
@@ -180,6 +167,24 @@ class SendVideo(BaseClient):
                 media = utils.get_input_media_from_file_id(video, file_ref, 4)
 
             while True:
+                if media is None:
+                    thumb = None if thumb is None else self.save_file(thumb)
+                    file = self.save_file(video, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(video) or "video/mp4",
+                        file=file,
+                        thumb=thumb,
+                        attributes=[
+                            types.DocumentAttributeVideo(
+                                supports_streaming=supports_streaming or None,
+                                duration=duration,
+                                w=width,
+                                h=height
+                            ),
+                            types.DocumentAttributeFilename(file_name=os.path.basename(video))
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -195,17 +200,28 @@ class SendVideo(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(video, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
@@ -126,28 +126,33 @@ class SendVideoNote(BaseClient):
                 app.send_video_note("me", "video_note.mp4", length=25)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(video_note):
-                thumb = None if thumb is None else self.save_file(thumb)
-                file = self.save_file(video_note, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(video_note) or "video/mp4",
-                    file=file,
-                    thumb=thumb,
-                    attributes=[
-                        types.DocumentAttributeVideo(
-                            round_message=True,
-                            duration=duration,
-                            w=length,
-                            h=length
-                        )
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(video_note, self.guess_mime_type(video_note) or "video/mp4", 13)
+                media = self.get_cached_upload(cache_key)
             else:
                 media = utils.get_input_media_from_file_id(video_note, file_ref, 13)
 
             while True:
+                if media is None:
+                    thumb = None if thumb is None else self.save_file(thumb)
+                    file = self.save_file(video_note, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(video_note) or "video/mp4",
+                        file=file,
+                        thumb=thumb,
+                        attributes=[
+                            types.DocumentAttributeVideo(
+                                round_message=True,
+                                duration=duration,
+                                w=length,
+                                h=length
+                            )
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -163,17 +168,28 @@ class SendVideoNote(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(video_note, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
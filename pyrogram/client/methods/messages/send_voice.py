@@ -130,20 +130,12 @@ class SendVoice(BaseClient):
                 app.send_voice("me", "voice.ogg", duration=20)
         """
         file = None
+        cache_key = None
 
         try:
             if os.path.exists(voice):
-                file = self.save_file(voice, progress=progress, progress_args=progress_args)
-                media = types.InputMediaUploadedDocument(
-                    mime_type=self.guess_mime_type(voice) or "audio/mpeg",
-                    file=file,
-                    attributes=[
-                        types.DocumentAttributeAudio(
-                            voice=True,
-                            duration=duration
-                        )
-                    ]
-                )
+                cache_key = self.get_upload_cache_key(voice, self.guess_mime_type(voice) or "audio/mpeg", 3)
+                media = self.get_cached_upload(cache_key)
             elif voice.startswith("http"):
                 media = types.InputMediaDocumentExternal(
                     url=voice
@@ -152,6 +144,19 @@ class SendVoice(BaseClient):
                 media = utils.get_input_media_from_file_id(voice, file_ref, 3)
 
             while True:
+                if media is None:
+                    file = self.save_file(voice, progress=progress, progress_args=progress_args)
+                    media = types.InputMediaUploadedDocument(
+                        mime_type=self.guess_mime_type(voice) or "audio/mpeg",
+                        file=file,
+                        attributes=[
+                            types.DocumentAttributeAudio(
+                                voice=True,
+                                duration=duration
+                            )
+                        ]
+                    )
+
                 try:
                     r = self.send(
                         functions.messages.SendMedia(
@@ -167,17 +172,28 @@ class SendVoice(BaseClient):
                     )
                 except FilePartMissing as e:
                     self.save_file(voice, file_id=file.id, file_part=e.x)
+                except BaseClient.UPLOAD_CACHE_ERRORS:
+                    if file is not None or cache_key is None:
+                        raise
+
+                    # The cached upload is no longer valid: forget about it and upload the file again
+                    self.storage.delete_cached_upload(*cache_key)
+                    media = None
                 else:
                     for i in r.updates:
                         if isinstance(
                             i,
                             (types.UpdateNewMessage, types.UpdateNewChannelMessage, types.UpdateNewScheduledMessage)
                         ):
-                            return pyrogram.Message._parse(
+                            message = pyrogram.Message._parse(
                                 self, i.message,
                                 {i.id: i for i in r.users},
                                 {i.id: i for i in r.chats},
                                 is_scheduled=isinstance(i, types.UpdateNewScheduledMessage)
                             )
+
+                            self.update_cached_upload(cache_key, message)
+
+                            return message
         except BaseClient.StopTransmission:
             return None
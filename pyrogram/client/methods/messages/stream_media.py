@@ -0,0 +1,99 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Union, Generator
+
+import pyrogram
+from pyrogram.client.ext import BaseClient, utils
+
+
+class StreamMedia(BaseClient):
+    def stream_media(
+        self,
+        message: Union["pyrogram.Message", str],
+        file_ref: str = None,
+        offset: int = 0,
+        limit: int = 0,
+        bandwidth_limit: int = None
+    ) -> Generator[bytes, None, None]:
+        """Stream the media from a message, chunk by chunk.
+
+        Unlike :meth:`~Client.download_media`, nothing is written to disk: the file content is yielded in order as soon
+        as it arrives, so that it can be piped straight into something else. Only a range of the file can be
+        requested by passing *offset* and *limit*.
+
+        Parameters:
+            message (:obj:`Message` | ``str``):
+                Pass a Message containing the media, the media itself (message.audio, message.video, ...) or
+                the file id as string.
+
+            file_ref (``str``, *optional*):
+                A valid file reference obtained by a recently fetched media message.
+                To be used in combination with a file id in case a file reference is needed.
+
+            offset (``int``, *optional*):
+                Position of the first byte to be returned.
+                Defaults to 0 (the beginning of the file).
+
+            limit (``int``, *optional*):
+                Maximum amount of bytes to be returned.
+                By default, no limit is applied and the file is streamed until the end.
+
+            bandwidth_limit (``int``, *optional*):
+                Maximum download speed of this stream, in bytes per second, on top of the limits set with
+                :meth:`~Client.set_bandwidth_limit`.
+
+        Returns:
+            ``Generator``: A generator yielding chunks of the file as ``bytes``.
+
+        Raises:
+            ValueError: if the message doesn't contain any downloadable media
+
+        Example:
+            .. code-block:: python
+
+                # Stream a whole file
+                with open("video.mp4", "wb") as f:
+                    for chunk in app.stream_media(message):
+                        f.write(chunk)
+
+                # Get only the first KiB
+                head = b"".join(app.stream_media(message, limit=1024))
+        """
+        data = utils.get_file_data(message, file_ref)
+
+        for _, chunk in self.iter_file(
+            media_type=data.media_type,
+            dc_id=data.dc_id,
+            document_id=data.document_id,
+            access_hash=data.access_hash,
+            thumb_size=data.thumb_size,
+            peer_id=data.peer_id,
+            peer_type=data.peer_type,
+            peer_access_hash=data.peer_access_hash,
+            volume_id=data.volume_id,
+            local_id=data.local_id,
+            file_ref=data.file_ref,
+            file_size=data.file_size,
+            is_big=data.is_big,
+            offset=offset,
+            limit=limit,
+            refresh_file_ref=utils.get_file_ref_refresher(self, message),
+            bandwidth_limit=bandwidth_limit
+        ):
+            yield chunk
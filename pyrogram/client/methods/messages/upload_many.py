@@ -0,0 +1,163 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Union, Iterable
+
+import pyrogram
+from pyrogram.client.ext import BaseClient, BulkTransfer, Journal
+from pyrogram.errors import FloodWait
+
+log = logging.getLogger(__name__)
+
+
+class UploadMany(BaseClient):
+    def upload_many(
+        self,
+        chat_id: Union[int, str],
+        documents: Iterable[str],
+        disable_notification: bool = None,
+        journal: str = None
+    ) -> BulkTransfer:
+        """Send many local files at once, as documents.
+
+        The files are uploaded and sent by a few threads in parallel, so the messages may not appear in the chat in the
+        same order as *documents*. Each file goes through :meth:`~Client.send_document`: with the upload cache enabled,
+        files sent before are not uploaded again. The files are consumed lazily and only a bounded number of them is in
+        flight at any time.
+
+        Files are always uploaded to the DC of your account, so there are no DCs to group them by. The parts of each
+        file are already pipelined over the pool of upload sessions by :meth:`~Client.save_file`, which the files in
+        flight share.
+
+        Parameters:
+            chat_id (``int`` | ``str``):
+                Unique identifier (int) or username (str) of the target chat.
+                For your personal cloud (Saved Messages) you can simply use "me" or "self".
+                For a contact that exists in your Telegram address book you can use his phone number (str).
+
+            documents (Iterable of ``str``):
+                Paths of the files to send.
+
+            disable_notification (``bool``, *optional*):
+                Sends the messages silently.
+                Users will receive a notification with no sound.
+
+            journal (``str``, *optional*):
+                Path of a file keeping track of the files sent so far. Running the same batch again with the same
+                journal skips the files already sent (as long as they haven't changed), so that an interrupted batch
+                resumes where it stopped.
+
+        Returns:
+            ``BulkTransfer``: An iterable of *(path, message)* tuples, in the order the files are sent. The message is
+            None in case sending the file failed.
+
+        Example:
+            .. code-block:: python
+
+                transfer = app.upload_many("me", ["a.zip", "b.zip", "c.zip"])
+
+                for path, message in transfer:
+                    print(path, message.message_id)
+        """
+
+        def send(path: str) -> "pyrogram.Message":
+            while True:
+                try:
+                    return self.send_document(chat_id, path, disable_notification=disable_notification)
+                except FloodWait as e:
+                    # Only this file waits, the others keep going
+                    log.warning("Sleeping for {}s".format(e.x))
+                    time.sleep(e.x)
+
+        def get_key(path: str) -> str:
+            stat = os.stat(path)
+
+            return json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+
+        def run(transfer: BulkTransfer):
+            entries = Journal(journal) if journal else None
+            items = iter(documents)
+            pending = {}  # future -> (path, key)
+
+            executor = ThreadPoolExecutor(self.UPLOAD_MANY_WORKERS)
+
+            try:
+                while True:
+                    while items is not None and len(pending) < self.UPLOAD_MANY_WORKERS * 2:
+                        try:
+                            path = next(items)
+                        except StopIteration:
+                            items = None
+                            break
+
+                        try:
+                            key = get_key(path)
+                        except OSError as e:
+                            log.warning(e)
+                            transfer.failed += 1
+                            yield path, None
+                            continue
+
+                        if entries is not None and entries.get(key) is not None:
+                            transfer.skipped += 1
+                            continue
+
+                        pending[executor.submit(send, path)] = (path, key)
+
+                    transfer.in_flight = len(pending)
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        path, key = pending.pop(future)
+                        transfer.in_flight = len(pending)
+
+                        try:
+                            message = future.result()
+                        except Exception as e:
+                            log.error(e, exc_info=True)
+                            message = None
+
+                        if message is not None:
+                            transfer.completed += 1
+                            transfer.bytes += json.loads(key)[1]
+
+                            if entries is not None:
+                                entries.add(key, message.message_id)
+                        else:
+                            transfer.failed += 1
+
+                        yield path, message
+            finally:
+                for future in pending:
+                    future.cancel()
+
+                executor.shutdown(wait=False)
+
+                if entries is not None:
+                    entries.close()
+
+        return BulkTransfer(run)
@@ -76,6 +76,33 @@ class FileStorage(SQLiteStorage):
 
             version += 1
 
+        if version == 2:
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "CREATE TABLE dc_auth_keys ("
+                    "dc_id INTEGER PRIMARY KEY, "
+                    "auth_key BLOB NOT NULL, "
+                    "is_imported INTEGER NOT NULL)"
+                )
+
+            version += 1
+
+        if version == 3:
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "CREATE TABLE upload_cache ("
+                    "hash TEXT NOT NULL, "
+                    "size INTEGER NOT NULL, "
+                    "mime_type TEXT NOT NULL, "
+                    "media_type INTEGER NOT NULL, "
+                    "file_id TEXT NOT NULL, "
+                    "file_ref TEXT, "
+                    "date INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER)), "
+                    "PRIMARY KEY (hash, size, mime_type, media_type))"
+                )
+
+            version += 1
+
         self.version(version)
 
     def open(self):
@@ -16,6 +16,23 @@ CREATE TABLE peers (
     last_update_on INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER))
 );
 
+CREATE TABLE dc_auth_keys (
+    dc_id       INTEGER PRIMARY KEY,
+    auth_key    BLOB NOT NULL,
+    is_imported INTEGER NOT NULL
+);
+
+CREATE TABLE upload_cache (
+    hash       TEXT    NOT NULL,
+    size       INTEGER NOT NULL,
+    mime_type  TEXT    NOT NULL,
+    media_type INTEGER NOT NULL,
+    file_id    TEXT    NOT NULL,
+    file_ref   TEXT,
+    date       INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER)),
+    PRIMARY KEY (hash, size, mime_type, media_type)
+);
+
 CREATE TABLE version (
     number INTEGER PRIMARY KEY
 );
@@ -50,7 +50,7 @@ def get_input_peer(peer_id: int, access_hash: int, peer_type: str):
 
 
 class SQLiteStorage(Storage):
-    VERSION = 2
+    VERSION = 4
     USERNAME_TTL = 8 * 60 * 60
 
     def __init__(self, name: str):
@@ -134,6 +134,59 @@ class SQLiteStorage(Storage):
 
         return get_input_peer(*r)
 
+    def update_dc_auth_key(self, dc_id: int, auth_key: bytes, is_imported: bool):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "REPLACE INTO dc_auth_keys (dc_id, auth_key, is_imported)"
+                "VALUES (?, ?, ?)",
+                (dc_id, auth_key, is_imported)
+            )
+
+    def get_dc_auth_key(self, dc_id: int) -> Tuple[bytes, bool]:
+        r = self.conn.execute(
+            "SELECT auth_key, is_imported FROM dc_auth_keys WHERE dc_id = ?",
+            (dc_id,)
+        ).fetchone()
+
+        if r is None:
+            raise KeyError("DC not found: {}".format(dc_id))
+
+        return r[0], bool(r[1])
+
+    def delete_dc_auth_key(self, dc_id: int):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM dc_auth_keys WHERE dc_id = ?",
+                (dc_id,)
+            )
+
+    def update_cached_upload(self, hash: str, size: int, mime_type: str, media_type: int, file_id: str, file_ref: str):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "REPLACE INTO upload_cache (hash, size, mime_type, media_type, file_id, file_ref)"
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (hash, size, mime_type, media_type, file_id, file_ref)
+            )
+
+    def get_cached_upload(self, hash: str, size: int, mime_type: str, media_type: int) -> Tuple[str, str]:
+        r = self.conn.execute(
+            "SELECT file_id, file_ref FROM upload_cache "
+            "WHERE hash = ? AND size = ? AND mime_type = ? AND media_type = ?",
+            (hash, size, mime_type, media_type)
+        ).fetchone()
+
+        if r is None:
+            raise KeyError("Upload not found: {}".format(hash))
+
+        return r[0], r[1]
+
+    def delete_cached_upload(self, hash: str, size: int, mime_type: str, media_type: int):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM upload_cache WHERE hash = ? AND size = ? AND mime_type = ? AND media_type = ?",
+                (hash, size, mime_type, media_type)
+            )
+
     def _get(self):
         attr = inspect.stack()[2].function
 
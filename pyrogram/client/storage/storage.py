@@ -52,6 +52,24 @@ class Storage:
     def get_peer_by_phone_number(self, phone_number: str):
         raise NotImplementedError
 
+    def update_dc_auth_key(self, dc_id: int, auth_key: bytes, is_imported: bool):
+        raise NotImplementedError
+
+    def get_dc_auth_key(self, dc_id: int) -> Tuple[bytes, bool]:
+        raise NotImplementedError
+
+    def delete_dc_auth_key(self, dc_id: int):
+        raise NotImplementedError
+
+    def update_cached_upload(self, hash: str, size: int, mime_type: str, media_type: int, file_id: str, file_ref: str):
+        raise NotImplementedError
+
+    def get_cached_upload(self, hash: str, size: int, mime_type: str, media_type: int) -> Tuple[str, str]:
+        raise NotImplementedError
+
+    def delete_cached_upload(self, hash: str, size: int, mime_type: str, media_type: int):
+        raise NotImplementedError
+
     def dc_id(self, value: int = object):
         raise NotImplementedError
 
@@ -16,9 +16,8 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import logging
-import threading
-import time
 
 from .transport import *
 from ..session.internals import DataCenter
@@ -45,20 +44,19 @@ class Connection:
         self.address = DataCenter(dc_id, test_mode, ipv6)
         self.mode = self.MODES.get(mode, TCPAbridged)
 
-        self.lock = threading.Lock()
         self.connection = None
 
-    def connect(self):
+    async def connect(self):
         for i in range(Connection.MAX_RETRIES):
             self.connection = self.mode(self.ipv6, self.proxy)
 
             try:
                 log.info("Connecting...")
-                self.connection.connect(self.address)
-            except OSError as e:
+                await self.connection.connect(self.address)
+            except (OSError, asyncio.TimeoutError) as e:
                 log.warning(e)  # TODO: Remove
                 self.connection.close()
-                time.sleep(1)
+                await asyncio.sleep(1)
             else:
                 log.info("Connected! {} DC{} - IPv{} - {}".format(
                     "Test" if self.test_mode else "Production",
@@ -75,9 +73,8 @@ class Connection:
         self.connection.close()
         log.info("Disconnected")
 
-    def send(self, data: bytes):
-        with self.lock:
-            self.connection.sendall(data)
+    async def send(self, data: bytes):
+        await self.connection.sendall(data)
 
-    def recv(self) -> bytes or None:
-        return self.connection.recvall()
+    async def recv(self) -> bytes or None:
+        return await self.connection.recvall()
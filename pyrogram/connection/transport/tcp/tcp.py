@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import ipaddress
 import logging
 import socket
@@ -33,8 +34,15 @@ except ImportError as e:
 log = logging.getLogger(__name__)
 
 
-class TCP(socks.socksocket):
+class TCP:
+    TIMEOUT = 10
+
     def __init__(self, ipv6: bool, proxy: dict):
+        self.proxy = proxy
+        self.reader = None  # type: asyncio.StreamReader
+        self.writer = None  # type: asyncio.StreamWriter
+        self.lock = None  # type: asyncio.Lock
+
         if proxy.get("enabled", False):
             hostname = proxy.get("hostname", None)
             port = proxy.get("port", None)
@@ -42,14 +50,14 @@ class TCP(socks.socksocket):
             try:
                 ip_address = ipaddress.ip_address(hostname)
             except ValueError:
-                super().__init__(socket.AF_INET)
+                self.socket = socks.socksocket(socket.AF_INET)
             else:
                 if isinstance(ip_address, ipaddress.IPv6Address):
-                    super().__init__(socket.AF_INET6)
+                    self.socket = socks.socksocket(socket.AF_INET6)
                 else:
-                    super().__init__(socket.AF_INET)
+                    self.socket = socks.socksocket(socket.AF_INET)
 
-            self.set_proxy(
+            self.socket.set_proxy(
                 proxy_type=socks.SOCKS5,
                 addr=hostname,
                 port=port,
@@ -59,33 +67,63 @@ class TCP(socks.socksocket):
 
             log.info("Using proxy {}:{}".format(hostname, port))
         else:
-            super().__init__(
+            self.socket = socket.socket(
                 socket.AF_INET6 if ipv6
                 else socket.AF_INET
             )
 
-        self.settimeout(10)
+    async def connect(self, address: tuple):
+        loop = asyncio.get_event_loop()
+
+        if self.proxy.get("enabled", False):
+            # PySocks only speaks blocking sockets: let it do the proxy handshake off-loop, then hand the
+            # connected socket over to asyncio.
+            self.socket.settimeout(self.TIMEOUT)
+            await loop.run_in_executor(None, self.socket.connect, address)
+        else:
+            self.socket.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(self.socket, address), self.TIMEOUT)
+
+        self.socket.setblocking(False)
+        self.reader, self.writer = await asyncio.open_connection(sock=self.socket)
+        self.lock = asyncio.Lock()
 
     def close(self):
+        if self.writer is not None:
+            # The transport owns the socket from now on and will close it
+            self.writer.close()
+            return
+
         try:
-            self.shutdown(socket.SHUT_RDWR)
+            self.socket.shutdown(socket.SHUT_RDWR)
         except OSError:
             pass
         finally:
-            super().close()
+            self.socket.close()
 
-    def recvall(self, length: int) -> bytes or None:
-        data = b""
+    async def sendall(self, data: bytes):
+        # Writes are queued in call order; only draining needs to be serialized
+        self.writer.write(data)
 
-        while len(data) < length:
-            try:
-                packet = super().recv(length - len(data))
-            except OSError:
-                return None
-            else:
-                if packet:
-                    data += packet
-                else:
+        async with self.lock:
+            await self.writer.drain()
+
+    async def recvall(self, length: int) -> bytes or None:
+        chunks = []
+        missing = length
+
+        # The timeout is about inactivity, like a socket timeout: it starts over whenever some bytes arrive, so that
+        # big responses on slow links aren't cut short
+        try:
+            while missing:
+                chunk = await asyncio.wait_for(self.reader.read(missing), self.TIMEOUT)
+
+                if not chunk:
                     return None
 
-        return data
+                chunks.append(chunk)
+                missing -= len(chunk)
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        return b"".join(chunks)
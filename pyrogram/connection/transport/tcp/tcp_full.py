@@ -31,34 +31,35 @@ class TCPFull(TCP):
 
         self.seq_no = None
 
-    def connect(self, address: tuple):
-        super().connect(address)
+    async def connect(self, address: tuple):
+        await super().connect(address)
         self.seq_no = 0
 
-    def sendall(self, data: bytes, *args):
+    async def sendall(self, data: bytes):
         # 12 = packet_length (4), seq_no (4), crc32 (4) (at the end)
         data = pack("<II", len(data) + 12, self.seq_no) + data
         data += pack("<I", crc32(data))
         self.seq_no += 1
 
-        super().sendall(data)
+        await super().sendall(data)
 
-    def recvall(self, length: int = 0) -> bytes or None:
-        length = super().recvall(4)
+    async def recvall(self, length: int = 0) -> bytes or None:
+        length = await super().recvall(4)
 
         if length is None:
             return None
 
-        packet = super().recvall(unpack("<I", length)[0] - 4)
+        packet = await super().recvall(unpack("<I", length)[0] - 4)
 
         if packet is None:
             return None
 
-        packet = length + packet  # Whole data + checksum
+        # Work on views of the received buffer, so that big packets are never copied around
+        packet = memoryview(packet)
         checksum = packet[-4:]  # Checksum is at the last 4 bytes
-        packet = packet[:-4]  # Data without checksum
 
-        if crc32(packet) != unpack("<I", checksum)[0]:
+        # The checksum covers the whole data: packet_length (4) + tcp_seq_no (4) + payload
+        if crc32(packet[:-4], crc32(length)) != unpack("<I", checksum)[0]:
             return None
 
-        return packet[8:]  # Skip packet_length (4) and tcp_seq_no (4)
+        return packet[4:-4]  # Skip tcp_seq_no (4) and checksum (4)
@@ -27,7 +27,7 @@ from pyrogram.api import functions, types
 from pyrogram.api.core import TLObject, Long, Int
 from pyrogram.connection import Connection
 from pyrogram.crypto import AES, RSA, Prime
-from .internals import MsgId
+from .internals import MsgId, EventLoop
 
 log = logging.getLogger(__name__)
 
@@ -45,11 +45,13 @@ class Auth:
 
     @staticmethod
     def pack(data: TLObject) -> bytes:
+        data = data.write()
+
         return (
             bytes(8)
             + Long(MsgId())
-            + Int(len(data.write()))
-            + data.write()
+            + Int(len(data))
+            + data
         )
 
     @staticmethod
@@ -57,10 +59,14 @@ class Auth:
         b.seek(20)  # Skip auth_key_id (8), message_id (8) and message_length (4)
         return TLObject.read(b)
 
+    async def exchange(self, data: bytes) -> bytes or None:
+        await self.connection.send(data)
+        return await self.connection.recv()
+
     def send(self, data: TLObject):
         data = self.pack(data)
-        self.connection.send(data)
-        response = BytesIO(self.connection.recv())
+        # Only the network I/O runs on the event loop, the CPU-heavy key exchange math stays on the calling thread
+        response = BytesIO(EventLoop.run(self.exchange(data)))
 
         return self.unpack(response)
 
@@ -79,7 +85,7 @@ class Auth:
             try:
                 log.info("Start creating a new auth key on DC{}".format(self.dc_id))
 
-                self.connection.connect()
+                EventLoop.run(self.connection.connect())
 
                 # Step 1; Step 2
                 nonce = int.from_bytes(urandom(16), "little", signed=True)
@@ -260,4 +266,4 @@ class Auth:
             else:
                 return auth_key
             finally:
-                self.connection.close()
+                EventLoop.get().call_soon_threadsafe(self.connection.close)
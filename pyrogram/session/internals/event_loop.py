@@ -0,0 +1,72 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from threading import Thread, Lock, get_ident
+
+log = logging.getLogger(__name__)
+
+
+class EventLoop:
+    """Process-wide asyncio event loop running in a single background thread.
+
+    Every connection of every client (main, media and CDN sessions) is driven by this loop, so that the network
+    layer costs one thread in total instead of a handful of threads per session.
+    """
+
+    loop = None
+    thread = None
+    lock = Lock()
+
+    @classmethod
+    def get(cls) -> asyncio.AbstractEventLoop:
+        with cls.lock:
+            if cls.loop is None:
+                cls.loop = asyncio.new_event_loop()
+                cls.thread = Thread(target=cls.worker, name=cls.__name__, daemon=True)
+                cls.thread.start()
+
+            return cls.loop
+
+    @classmethod
+    def worker(cls):
+        log.debug("{} started".format(cls.__name__))
+
+        asyncio.set_event_loop(cls.loop)
+        cls.loop.run_forever()
+
+        log.debug("{} stopped".format(cls.__name__))
+
+    @classmethod
+    def is_current(cls) -> bool:
+        return cls.thread is not None and cls.thread.ident == get_ident()
+
+    @classmethod
+    def submit(cls, coro):
+        """Schedule a coroutine on the loop from any thread and return a :class:`concurrent.futures.Future`."""
+        return asyncio.run_coroutine_threadsafe(coro, cls.get())
+
+    @classmethod
+    def run(cls, coro, timeout: float = None):
+        """Run a coroutine on the loop and block the calling thread until it's done."""
+        if cls.is_current():
+            coro.close()
+            raise RuntimeError("Blocking calls can't be made from within the event loop thread")
+
+        return cls.submit(coro).result(timeout)
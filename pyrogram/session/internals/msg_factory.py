@@ -35,5 +35,5 @@ class MsgFactory:
             body,
             MsgId(),
             self.seq_no(type(body) not in not_content_related),
-            len(body)
+            body.serialized_size()
         )
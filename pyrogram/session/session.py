@@ -16,14 +16,13 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import logging
-import threading
-import time
+from concurrent.futures import Future
 from datetime import timedelta, datetime
 from hashlib import sha1, sha256
 from io import BytesIO
 from os import urandom
-from queue import Queue
 from threading import Event, Thread
 
 import pyrogram
@@ -33,27 +32,27 @@ from pyrogram.api.all import layer
 from pyrogram.api.core import Message, TLObject, MsgContainer, Long, FutureSalt, Int
 from pyrogram.connection import Connection
 from pyrogram.crypto import AES, KDF
-from pyrogram.errors import RPCError, InternalServerError, AuthKeyDuplicated
-from .internals import MsgId, MsgFactory
+from pyrogram.errors import RPCError, InternalServerError, AuthKeyDuplicated, AuthKeyUnregistered
+from .internals import MsgId, MsgFactory, EventLoop
 
 log = logging.getLogger(__name__)
 
 
-class Result:
-    def __init__(self):
-        self.value = None
-        self.event = Event()
-
-
 class Session:
     INITIAL_SALT = 0x616e67656c696361
-    NET_WORKERS = 1
     START_TIMEOUT = 1
     WAIT_TIMEOUT = 15
     MAX_RETRIES = 5
     ACKS_THRESHOLD = 8
     PING_INTERVAL = 5
 
+    # Outgoing messages (and pending acks) issued within BATCH_DELAY seconds of each other are coalesced into a
+    # single msg_container, up to BATCH_SIZE bytes or BATCH_LIMIT messages, and sent with one encryption pass and
+    # one socket write.
+    BATCH_DELAY = 0.0005
+    BATCH_SIZE = 64 * 1024
+    BATCH_LIMIT = 1020
+
     notice_displayed = False
 
     BAD_MSG_DESCRIPTION = {
@@ -89,6 +88,7 @@ class Session:
         self.is_media = is_media
         self.is_cdn = is_cdn
 
+        self.loop = EventLoop.get()
         self.connection = None
 
         self.auth_key_id = sha1(auth_key).digest()[-8:]
@@ -100,20 +100,29 @@ class Session:
 
         self.pending_acks = set()
 
-        self.recv_queue = Queue()
         self.results = {}
+        self.containers = {}
 
-        self.ping_thread = None
-        self.ping_thread_event = Event()
+        self.outgoing = []
+        self.outgoing_size = 0
+        self.flush_handle = None
 
-        self.next_salt_thread = None
-        self.next_salt_thread_event = Event()
-
-        self.net_worker_list = []
+        self.recv_task = None
+        self.ping_task = None
+        self.next_salt_task = None
 
         self.is_connected = Event()
 
     def start(self):
+        EventLoop.run(self._start())
+
+    def stop(self):
+        EventLoop.run(self._stop())
+
+    def restart(self):
+        EventLoop.run(self._restart())
+
+    async def _start(self):
         while True:
             self.connection = Connection(
                 self.dc_id,
@@ -123,35 +132,26 @@ class Session:
             )
 
             try:
-                self.connection.connect()
-
-                for i in range(self.NET_WORKERS):
-                    self.net_worker_list.append(
-                        Thread(
-                            target=self.net_worker,
-                            name="NetWorker#{}".format(i + 1)
-                        )
-                    )
-
-                    self.net_worker_list[-1].start()
+                await self.connection.connect()
 
-                Thread(target=self.recv, name="RecvThread").start()
+                self.recv_task = self.loop.create_task(self.recv())
 
                 self.current_salt = FutureSalt(0, 0, self.INITIAL_SALT)
                 self.current_salt = FutureSalt(
                     0, 0,
-                    self._send(
+                    (await self._send(
                         functions.Ping(ping_id=0),
                         timeout=self.START_TIMEOUT
-                    ).new_server_salt
+                    )).new_server_salt
                 )
-                self.current_salt = self._send(functions.GetFutureSalts(num=1), timeout=self.START_TIMEOUT).salts[0]
+                self.current_salt = (
+                    await self._send(functions.GetFutureSalts(num=1), timeout=self.START_TIMEOUT)
+                ).salts[0]
 
-                self.next_salt_thread = Thread(target=self.next_salt, name="NextSaltThread")
-                self.next_salt_thread.start()
+                self.next_salt_task = self.loop.create_task(self.next_salt())
 
                 if not self.is_cdn:
-                    self._send(
+                    await self._send(
                         functions.InvokeWithLayer(
                             layer=layer,
                             query=functions.InitConnection(
@@ -168,20 +168,19 @@ class Session:
                         timeout=self.START_TIMEOUT
                     )
 
-                self.ping_thread = Thread(target=self.ping, name="PingThread")
-                self.ping_thread.start()
+                self.ping_task = self.loop.create_task(self.ping())
 
                 log.info("Session initialized: Layer {}".format(layer))
                 log.info("Device: {} - {}".format(self.client.device_model, self.client.app_version))
                 log.info("System: {} ({})".format(self.client.system_version, self.client.lang_code.upper()))
 
-            except AuthKeyDuplicated as e:
-                self.stop()
+            except (AuthKeyDuplicated, AuthKeyUnregistered) as e:
+                await self._stop()
                 raise e
             except (OSError, TimeoutError, RPCError):
-                self.stop()
+                await self._stop()
             except Exception as e:
-                self.stop()
+                await self._stop()
                 raise e
             else:
                 break
@@ -190,75 +189,87 @@ class Session:
 
         log.debug("Session started")
 
-    def stop(self):
+    async def _stop(self):
         self.is_connected.clear()
 
-        self.ping_thread_event.set()
-        self.next_salt_thread_event.set()
+        for task in (self.ping_task, self.next_salt_task):
+            if task is not None:
+                task.cancel()
 
-        if self.ping_thread is not None:
-            self.ping_thread.join()
+        self.ping_task = None
+        self.next_salt_task = None
 
-        if self.next_salt_thread is not None:
-            self.next_salt_thread.join()
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
 
-        self.ping_thread_event.clear()
-        self.next_salt_thread_event.clear()
+        self.outgoing.clear()
+        self.outgoing_size = 0
+        self.containers.clear()
 
         self.connection.close()
 
-        for i in range(self.NET_WORKERS):
-            self.recv_queue.put(None)
-
-        for i in self.net_worker_list:
-            i.join()
-
-        self.net_worker_list.clear()
-        self.recv_queue.queue.clear()
+        if self.recv_task is not None:
+            await asyncio.wait([self.recv_task])
+            self.recv_task = None
 
         for i in self.results.values():
-            i.event.set()
+            if not i.done():
+                i.set_result(None)
 
         if not self.is_media and callable(self.client.disconnect_handler):
-            try:
-                self.client.disconnect_handler(self.client)
-            except Exception as e:
-                log.error(e, exc_info=True)
+            # User code must never run on (and possibly block) the event loop
+            self.loop.run_in_executor(None, self.on_disconnect)
 
         log.debug("Session stopped")
 
-    def restart(self):
-        self.stop()
-        self.start()
+    async def _restart(self):
+        await self._stop()
+        await self._start()
+
+    def on_disconnect(self):
+        try:
+            self.client.disconnect_handler(self.client)
+        except Exception as e:
+            log.error(e, exc_info=True)
 
     def pack(self, message: Message):
-        data = Long(self.current_salt.salt) + self.session_id + message.write()
-        padding = urandom(-(len(data) + 12) % 16 + 12)
+        # The whole message is serialized once, straight into the buffer that gets encrypted
+        data = bytearray(Long(self.current_salt.salt))
+        data += self.session_id
+        message.write_to(data)
+        data += urandom(-(len(data) + 12) % 16 + 12)
 
         # 88 = 88 + 0 (outgoing message)
-        msg_key_large = sha256(self.auth_key[88: 88 + 32] + data + padding).digest()
-        msg_key = msg_key_large[8:24]
+        msg_key_large = sha256(self.auth_key[88: 88 + 32])
+        msg_key_large.update(data)
+        msg_key = msg_key_large.digest()[8:24]
         aes_key, aes_iv = KDF(self.auth_key, msg_key, True)
 
-        return self.auth_key_id + msg_key + AES.ige256_encrypt(data + padding, aes_key, aes_iv)
+        return self.auth_key_id + msg_key + AES.ige256_encrypt(data, aes_key, aes_iv)
+
+    def unpack(self, packet: bytes) -> Message:
+        # Slice the packet through a memoryview: the encrypted payload is handed over to the cipher without copies
+        packet = memoryview(packet)
 
-    def unpack(self, b: BytesIO) -> Message:
-        assert b.read(8) == self.auth_key_id, b.getvalue()
+        assert packet[:8] == self.auth_key_id, bytes(packet)
 
-        msg_key = b.read(16)
+        msg_key = bytes(packet[8:24])
         aes_key, aes_iv = KDF(self.auth_key, msg_key, False)
-        data = BytesIO(AES.ige256_decrypt(b.read(), aes_key, aes_iv))
-        data.read(8)
+        data = AES.ige256_decrypt(packet[24:], aes_key, aes_iv)
 
         # https://core.telegram.org/mtproto/security_guidelines#checking-session-id
-        assert data.read(8) == self.session_id
+        assert data[8:16] == self.session_id
 
-        message = Message.read(data)
+        # Skip salt (8) and session_id (8)
+        message, _ = Message.read_from(memoryview(data), 16)
 
         # https://core.telegram.org/mtproto/security_guidelines#checking-sha256-hash-value-of-msg-key
         # https://core.telegram.org/mtproto/security_guidelines#checking-message-length
         # 96 = 88 + 8 (incoming message)
-        assert msg_key == sha256(self.auth_key[96:96 + 32] + data.getvalue()).digest()[8:24]
+        msg_key_large = sha256(self.auth_key[96:96 + 32])
+        msg_key_large.update(data)
+        assert msg_key == msg_key_large.digest()[8:24]
 
         # https://core.telegram.org/mtproto/security_guidelines#checking-msg-id
         # TODO: check for lower msg_ids
@@ -266,91 +277,69 @@ class Session:
 
         return message
 
-    def net_worker(self):
-        name = threading.current_thread().name
-        log.debug("{} started".format(name))
+    async def handle_packet(self, packet: bytes):
+        data = self.unpack(packet)
 
-        while True:
-            packet = self.recv_queue.get()
+        messages = (
+            data.body.messages
+            if isinstance(data.body, MsgContainer)
+            else [data]
+        )
 
-            if packet is None:
-                break
+        log.debug(data)
 
-            try:
-                data = self.unpack(BytesIO(packet))
+        for msg in messages:
+            if msg.seq_no % 2 != 0:
+                if msg.msg_id in self.pending_acks:
+                    continue
+                else:
+                    self.pending_acks.add(msg.msg_id)
 
-                messages = (
-                    data.body.messages
-                    if isinstance(data.body, MsgContainer)
-                    else [data]
-                )
+            if isinstance(msg.body, (types.MsgDetailedInfo, types.MsgNewDetailedInfo)):
+                self.pending_acks.add(msg.body.answer_msg_id)
+                continue
 
-                log.debug(data)
-
-                for msg in messages:
-                    if msg.seq_no % 2 != 0:
-                        if msg.msg_id in self.pending_acks:
-                            continue
-                        else:
-                            self.pending_acks.add(msg.msg_id)
-
-                    if isinstance(msg.body, (types.MsgDetailedInfo, types.MsgNewDetailedInfo)):
-                        self.pending_acks.add(msg.body.answer_msg_id)
-                        continue
-
-                    if isinstance(msg.body, types.NewSessionCreated):
-                        continue
-
-                    msg_id = None
-
-                    if isinstance(msg.body, (types.BadMsgNotification, types.BadServerSalt)):
-                        msg_id = msg.body.bad_msg_id
-                    elif isinstance(msg.body, (core.FutureSalts, types.RpcResult)):
-                        msg_id = msg.body.req_msg_id
-                    elif isinstance(msg.body, types.Pong):
-                        msg_id = msg.body.msg_id
-                    else:
-                        if self.client is not None:
-                            self.client.updates_queue.put(msg.body)
-
-                    if msg_id in self.results:
-                        self.results[msg_id].value = getattr(msg.body, "result", msg.body)
-                        self.results[msg_id].event.set()
-
-                if len(self.pending_acks) >= self.ACKS_THRESHOLD:
-                    log.info("Send {} acks".format(len(self.pending_acks)))
-
-                    try:
-                        self._send(types.MsgsAck(msg_ids=list(self.pending_acks)), False)
-                    except (OSError, TimeoutError):
-                        pass
-                    else:
-                        self.pending_acks.clear()
-            except Exception as e:
-                log.error(e, exc_info=True)
+            if isinstance(msg.body, types.NewSessionCreated):
+                continue
 
-        log.debug("{} stopped".format(name))
+            msg_id = None
 
-    def ping(self):
-        log.debug("PingThread started")
+            if isinstance(msg.body, (types.BadMsgNotification, types.BadServerSalt)):
+                msg_id = msg.body.bad_msg_id
+            elif isinstance(msg.body, (core.FutureSalts, types.RpcResult)):
+                msg_id = msg.body.req_msg_id
+            elif isinstance(msg.body, types.Pong):
+                msg_id = msg.body.msg_id
+            else:
+                if self.client is not None:
+                    self.client.updates_queue.put(msg.body)
 
-        while True:
-            self.ping_thread_event.wait(self.PING_INTERVAL)
+            # Notifications about a container (e.g.: bad server salt) concern every message inside it
+            for i in self.containers.pop(msg_id, [msg_id]):
+                result = self.results.get(i)
 
-            if self.ping_thread_event.is_set():
-                break
+                if result is not None and not result.done():
+                    result.set_result(getattr(msg.body, "result", msg.body))
+
+        if len(self.pending_acks) >= self.ACKS_THRESHOLD:
+            # Acks are sent along with the next outgoing batch
+            self.schedule_flush()
+
+    async def ping(self):
+        log.debug("PingTask started")
+
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
 
             try:
-                self._send(functions.PingDelayDisconnect(
+                await self._send(functions.PingDelayDisconnect(
                     ping_id=0, disconnect_delay=self.WAIT_TIMEOUT + 10
                 ), False)
             except (OSError, TimeoutError, RPCError):
                 pass
 
-        log.debug("PingThread stopped")
-
-    def next_salt(self):
-        log.debug("NextSaltThread started")
+    async def next_salt(self):
+        log.debug("NextSaltTask started")
 
         while True:
             now = datetime.now()
@@ -367,60 +356,134 @@ class Session:
                 now + timedelta(seconds=dt)
             ))
 
-            self.next_salt_thread_event.wait(dt)
-
-            if self.next_salt_thread_event.is_set():
-                break
+            await asyncio.sleep(max(dt, 0))
 
             try:
-                self.current_salt = self._send(functions.GetFutureSalts(num=1)).salts[0]
+                self.current_salt = (await self._send(functions.GetFutureSalts(num=1))).salts[0]
             except (OSError, TimeoutError, RPCError):
                 self.connection.close()
                 break
 
-        log.debug("NextSaltThread stopped")
+        log.debug("NextSaltTask stopped")
 
-    def recv(self):
-        log.debug("RecvThread started")
+    async def recv(self):
+        log.debug("RecvTask started")
 
         while True:
-            packet = self.connection.recv()
+            packet = await self.connection.recv()
 
             if packet is None or len(packet) == 4:
                 if packet:
-                    log.warning("Server sent \"{}\"".format(Int.read(BytesIO(packet))))
+                    error_code = Int.read(BytesIO(packet))
+
+                    log.warning("Server sent \"{}\"".format(error_code))
+
+                    # The auth key is unknown to the server: fail pending requests instead of retrying forever
+                    if error_code == -404:
+                        for i in self.results.values():
+                            if not i.done():
+                                i.set_exception(AuthKeyUnregistered())
 
                 if self.is_connected.is_set():
                     Thread(target=self.restart, name="RestartThread").start()
                 break
 
-            self.recv_queue.put(packet)
+            try:
+                await self.handle_packet(packet)
+            except Exception as e:
+                log.error(e, exc_info=True)
 
-        log.debug("RecvThread stopped")
+        log.debug("RecvTask stopped")
 
-    def _send(self, data: TLObject, wait_response: bool = True, timeout: float = WAIT_TIMEOUT):
-        message = self.msg_factory(data)
-        msg_id = message.msg_id
+    def schedule_flush(self):
+        if self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(self.BATCH_DELAY, self.flush)
 
-        if wait_response:
-            self.results[msg_id] = Result()
+    def enqueue(self, message: Message):
+        # 16 = msg_id (8), seq_no (4), length (4)
+        size = message.length + 16
+
+        if self.outgoing and self.outgoing_size + size > self.BATCH_SIZE:
+            self.flush()
+
+        self.outgoing.append(message)
+        self.outgoing_size += size
+
+        if self.outgoing_size >= self.BATCH_SIZE or len(self.outgoing) >= self.BATCH_LIMIT:
+            self.flush()
+        else:
+            self.schedule_flush()
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        messages = self.outgoing
+        acks = self.pending_acks
+
+        self.outgoing = []
+        self.outgoing_size = 0
+
+        if acks and len(messages) < self.BATCH_LIMIT:
+            log.info("Send {} acks".format(len(acks)))
+
+            self.pending_acks = set()
+            messages.append(self.msg_factory(types.MsgsAck(msg_ids=list(acks))))
+        else:
+            acks = set()
 
-        payload = self.pack(message)
+        if not messages:
+            return
 
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = self.msg_factory(MsgContainer(messages))
+
+            # Forget about containers whose messages have all been answered already
+            self.containers = {
+                k: v for k, v in self.containers.items()
+                if any(i in self.results for i in v)
+            }
+
+            self.containers[message.msg_id] = [i.msg_id for i in messages]
+
+        self.loop.create_task(self.write(self.pack(message), messages, acks))
+
+    async def write(self, payload: bytes, messages: list, acks: set):
         try:
-            self.connection.send(payload)
+            await self.connection.send(payload)
         except OSError as e:
-            self.results.pop(msg_id, None)
-            raise e
+            self.pending_acks.update(acks)
+
+            for message in messages:
+                result = self.results.get(message.msg_id)
+
+                if result is not None and not result.done():
+                    result.set_exception(e)
+
+    async def _send(self, data: TLObject, wait_response: bool = True, timeout: float = WAIT_TIMEOUT):
+        message = self.msg_factory(data)
+        msg_id = message.msg_id
 
         if wait_response:
-            self.results[msg_id].event.wait(timeout)
-            result = self.results.pop(msg_id).value
+            self.results[msg_id] = self.loop.create_future()
+
+        self.enqueue(message)
+
+        if wait_response:
+            try:
+                result = await asyncio.wait_for(self.results[msg_id], timeout)
+            except asyncio.TimeoutError:
+                result = None
+            finally:
+                self.results.pop(msg_id, None)
 
             if result is None:
                 raise TimeoutError
             elif isinstance(result, types.RpcError):
-                if isinstance(data, (functions.InvokeWithoutUpdates, functions.InvokeWithTakeout)):
+                while isinstance(data, (functions.InvokeWithoutUpdates, functions.InvokeWithTakeout)):
                     data = data.query
 
                 RPCError.raise_it(result, type(data))
@@ -432,11 +495,13 @@ class Session:
             else:
                 return result
 
-    def send(self, data: TLObject, retries: int = MAX_RETRIES, timeout: float = WAIT_TIMEOUT):
-        self.is_connected.wait(self.WAIT_TIMEOUT)
+    async def invoke(self, data: TLObject, retries: int = MAX_RETRIES, timeout: float = WAIT_TIMEOUT):
+        if not self.is_connected.is_set():
+            # Rare path (reconnections): wait off-loop so that other sessions keep running
+            await self.loop.run_in_executor(None, self.is_connected.wait, self.WAIT_TIMEOUT)
 
         try:
-            return self._send(data, timeout=timeout)
+            return await self._send(data, timeout=timeout)
         except (OSError, TimeoutError, InternalServerError) as e:
             if retries == 0:
                 raise e from None
@@ -446,5 +511,13 @@ class Session:
                     Session.MAX_RETRIES - retries + 1,
                     data.QUALNAME, e))
 
-            time.sleep(0.5)
-            return self.send(data, retries - 1, timeout)
+            await asyncio.sleep(0.5)
+            return await self.invoke(data, retries - 1, timeout)
+
+    def send(self, data: TLObject, retries: int = MAX_RETRIES, timeout: float = WAIT_TIMEOUT):
+        return EventLoop.run(self.invoke(data, retries, timeout))
+
+    def send_async(self, data: TLObject, retries: int = MAX_RETRIES, timeout: float = WAIT_TIMEOUT) -> Future:
+        # Many requests can be in flight at once on the same connection; each one is tracked by its msg_id in
+        # self.results. Cancelling the returned future cancels the request and frees its slot.
+        return EventLoop.submit(self.invoke(data, retries, timeout))
@@ -0,0 +1,135 @@
+# Pyrogram - Telegram MTProto API Client Library for Python
+# Copyright (C) 2017-2020 Dan <https://github.com/delivrance>
+#
+# This file is part of Pyrogram.
+#
+# Pyrogram is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pyrogram is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+from threading import Condition, Thread
+
+from .internals import EventLoop
+from .session import Session
+
+log = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Pool of warm sessions, each one handed out to a single user at a time.
+
+    Sessions are created on demand by *factory*, up to *max_size* at once, and kept open after being released so
+    that the next user doesn't pay the connection setup again. Sessions left unused for *idle_timeout* seconds are
+    closed.
+
+    Non-blocking acquires only hand out idle sessions. In case there's room for one more, it is started in the
+    background, to be found idle by a later acquire.
+    """
+
+    def __init__(self, factory: callable, max_size: int, idle_timeout: float):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+
+        self.sessions = set()
+        self.idle = []  # (session, released_at), most recently released last
+        self.condition = Condition()
+
+    def acquire(self, block: bool = True) -> Session or None:
+        with self.condition:
+            while not self.idle and len(self.sessions) >= self.max_size:
+                if not block:
+                    return None
+
+                self.condition.wait()
+
+            if self.idle:
+                return self.idle.pop()[0]
+
+            # Reserve the slot while the session is being started outside the lock
+            placeholder = object()
+            self.sessions.add(placeholder)
+
+        if not block:
+            Thread(target=self.warm_up, args=(placeholder,), name="SessionPoolWarmUp", daemon=True).start()
+            return None
+
+        return self.start(placeholder)
+
+    def start(self, placeholder: object) -> Session:
+        try:
+            session = self.factory()
+        except Exception:
+            with self.condition:
+                self.sessions.discard(placeholder)
+                self.condition.notify()
+
+            raise
+
+        with self.condition:
+            # Unless the pool has been closed in the meantime
+            if placeholder in self.sessions:
+                self.sessions.discard(placeholder)
+                self.sessions.add(session)
+
+        return session
+
+    def warm_up(self, placeholder: object):
+        try:
+            session = self.start(placeholder)
+        except Exception as e:
+            log.warning("Unable to start a session in the background: {}".format(e))
+        else:
+            self.release(session)
+
+    def release(self, session: Session):
+        with self.condition:
+            if session not in self.sessions:
+                # The pool has been closed in the meantime
+                stop = True
+            else:
+                stop = False
+                self.idle.append((session, time.monotonic()))
+                self.condition.notify()
+
+        if stop:
+            session.stop()
+        else:
+            loop = EventLoop.get()
+            loop.call_soon_threadsafe(loop.call_later, self.idle_timeout, self.evict)
+
+    def evict(self):
+        # Runs on the event loop
+        now = time.monotonic()
+
+        with self.condition:
+            expired = [s for s, t in self.idle if now - t >= self.idle_timeout]
+            self.idle = [(s, t) for s, t in self.idle if now - t < self.idle_timeout]
+            self.sessions.difference_update(expired)
+            self.condition.notify_all()
+
+        for session in expired:
+            log.debug("Closing idle session on DC{}".format(session.dc_id))
+            EventLoop.get().create_task(session._stop())
+
+    def close(self):
+        with self.condition:
+            idle = [s for s, _ in self.idle]
+
+            self.idle.clear()
+            self.sessions.clear()
+            self.condition.notify_all()
+
+        for session in idle:
+            session.stop()